@@ -1,7 +1,14 @@
 """Configuration settings for iPhone Bridge."""
 
+from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
+# The checkout the bridge runs from; relative data paths resolve here rather
+# than against whatever directory the service was started in
+INSTALL_DIR = Path(__file__).resolve().parent.parent
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -19,6 +26,10 @@ class Settings(BaseSettings):
     # Polling interval for chat.db (seconds)
     poll_interval: float = 2.0
 
+    # Wake the watcher on chat.db file-system events instead of polling
+    # (poll_interval is then unused; a slow fallback poll still runs)
+    use_fs_events: bool = True
+
     # Server settings
     host: str = "0.0.0.0"
     port: int = 8080
@@ -29,10 +40,27 @@ class Settings(BaseSettings):
     # Whether to process messages from before startup
     process_historical: bool = False
 
+    # Where failed deliveries wait for retry: "sqlite" keeps them in
+    # queue_db_path so they survive restarts, "memory" drops them on exit.
+    # A relative queue_db_path is taken from the install directory.
+    queue_backend: Literal["memory", "sqlite"] = "sqlite"
+    queue_db_path: Path = Path("retry_queue.db")
+
+    # How attachments reach Nightline: "inline" embeds them as base64 in the
+    # JSON webhook, "multipart" streams the raw files as multipart/form-data
+    # (falls back to inline if Nightline answers 415)
+    attachment_upload: Literal["inline", "multipart"] = "inline"
+
     # Mock mode - don't connect to chat.db (for development/testing)
     mock_mode: bool = False
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
+    @property
+    def queue_db_file(self) -> Path:
+        """queue_db_path, resolved against the install directory if relative."""
+        path = self.queue_db_path.expanduser()
+        return path if path.is_absolute() else INSTALL_DIR / path
+
 
 settings = Settings()
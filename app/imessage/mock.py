@@ -11,7 +11,8 @@ Provides:
 
 import asyncio
 import logging
-import uuid
+import secrets
+from collections import deque
 from datetime import datetime, timezone
 from typing import Awaitable, Callable
 
@@ -20,6 +21,9 @@ from app.imessage.sender import SendResponse, SendResult
 
 logger = logging.getLogger(__name__)
 
+# Injected messages kept for /test/received; older ones fall off the end
+MESSAGE_HISTORY_SIZE = 500
+
 
 class MockiMessageWatcher:
     """
@@ -43,7 +47,9 @@ class MockiMessageWatcher:
         self.poll_interval = poll_interval
         self._running = False
         self._rowid_counter = 0
-        self._message_history: list[IncomingMessage] = []
+        self._message_history: deque[IncomingMessage] = deque(maxlen=MESSAGE_HISTORY_SIZE)
+        # Optional hook called with each injected message (the test UI stream)
+        self.on_inject: Callable[[IncomingMessage], None] | None = None
     
     async def start(self, skip_historical: bool = True):
         """Start the mock watcher."""
@@ -84,7 +90,7 @@ class MockiMessageWatcher:
         
         message = IncomingMessage(
             rowid=self._rowid_counter,
-            guid=f"mock-{uuid.uuid4().hex[:12]}",
+            guid=f"mock-{secrets.token_hex(6)}",
             phone=phone,
             text=text,
             received_at=datetime.now(tz=timezone.utc),
@@ -94,6 +100,8 @@ class MockiMessageWatcher:
         
         self._message_history.append(message)
         logger.info(f"🧪 Injected mock message: {message}")
+        if self.on_inject:
+            self.on_inject(message)
         
         # Trigger the callback (same as real watcher)
         if self._running:
@@ -104,9 +112,27 @@ class MockiMessageWatcher:
         
         return message
     
-    def get_message_history(self) -> list[IncomingMessage]:
-        """Get all injected messages."""
-        return list(self._message_history)
+    def get_message_history(
+        self, after_guid: str | None = None, limit: int | None = None
+    ) -> list[IncomingMessage]:
+        """
+        Get injected messages, oldest first.
+        
+        Args:
+            after_guid: Only return messages injected after this one
+            limit: Return at most this many of the newest messages
+        """
+        if after_guid is None and limit is None:
+            return list(self._message_history)
+        
+        # Walk back from the newest so a poll only touches the delta
+        newest: list[IncomingMessage] = []
+        for message in reversed(self._message_history):
+            if message.guid == after_guid or (limit is not None and len(newest) >= limit):
+                break
+            newest.append(message)
+        newest.reverse()
+        return newest
 
 
 class MockiMessageSender:
@@ -124,6 +150,8 @@ class MockiMessageSender:
     def __init__(self, timeout: float = 30.0):
         self.timeout = timeout
         self._sent_messages: list[dict] = []
+        # Optional hook called with each logged message (the test UI stream)
+        self.on_send: Callable[[dict], None] | None = None
     
     async def send(self, phone: str, text: str) -> SendResponse:
         """
@@ -149,7 +177,7 @@ class MockiMessageSender:
             )
         
         message = {
-            "id": f"mock-sent-{uuid.uuid4().hex[:12]}",
+            "id": f"mock-sent-{secrets.token_hex(6)}",
             "phone": phone,
             "text": text,
             "sent_at": datetime.now(tz=timezone.utc).isoformat(),
@@ -158,6 +186,8 @@ class MockiMessageSender:
         
         self._sent_messages.append(message)
         logger.info(f"🧪 Mock sent message to {phone}: {text[:50]}...")
+        if self.on_send:
+            self.on_send(message)
         
         return SendResponse(result=SendResult.SUCCESS)
     
@@ -191,7 +221,7 @@ class MockiMessageSender:
             )
         
         message = {
-            "id": f"mock-sent-{uuid.uuid4().hex[:12]}",
+            "id": f"mock-sent-{secrets.token_hex(6)}",
             "phone": phone,
             "file_path": file_path,
             "file_name": path.name,
@@ -202,6 +232,8 @@ class MockiMessageSender:
         
         self._sent_messages.append(message)
         logger.info(f"🧪 Mock sent attachment to {phone}: {path.name}")
+        if self.on_send:
+            self.on_send(message)
         
         return SendResponse(result=SendResult.SUCCESS)
     
@@ -5,7 +5,7 @@ from datetime import datetime
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Attachment:
     """Represents an attachment (image, video, etc.) in an iMessage."""
     
@@ -34,7 +34,7 @@ class Attachment:
         return f"<Attachment {self.filename} ({self.mime_type}, {self.size_bytes} bytes)>"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IncomingMessage:
     """Represents an incoming iMessage/SMS from chat.db."""
 
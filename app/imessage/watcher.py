@@ -21,6 +21,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Awaitable, Callable, TYPE_CHECKING
 
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
 from app.imessage.models import Attachment, IncomingMessage
 
 if TYPE_CHECKING:
@@ -34,6 +37,90 @@ CHAT_DB_PATH = Path.home() / "Library" / "Messages" / "chat.db"
 # Apple's epoch starts on 2001-01-01 (vs Unix 1970-01-01)
 APPLE_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
 
+# Max messages fetched per query. A full batch means more are probably
+# waiting, so the poll loop fetches again without sleeping.
+BATCH_SIZE = 100
+
+# Messages drained back-to-back before yielding to the event loop
+MAX_DRAIN_MESSAGES = 500
+
+# With file-system events, poll anyway this often in case an event is missed
+FS_EVENTS_FALLBACK_INTERVAL = 30.0
+
+# New inbound messages, without touching the attachment tables.
+# Includes messages with attachments even if text is empty.
+_MSG_QUERY_NOATTACH = """
+    SELECT
+        m.ROWID,
+        m.guid,
+        m.text,
+        m.date,
+        m.is_from_me,
+        m.service,
+        m.cache_has_attachments,
+        h.id as handle_id
+    FROM message m
+    LEFT JOIN handle h ON m.handle_id = h.ROWID
+    WHERE m.ROWID > ?
+      AND (
+          (m.text IS NOT NULL AND m.text != '')
+          OR m.cache_has_attachments = 1
+      )
+    ORDER BY m.ROWID ASC
+    LIMIT ?
+"""
+
+# Same batch with attachments joined in (one row per attachment). The LIMIT
+# lives in the subquery so it still caps messages rather than joined rows.
+_MSG_QUERY_WITH_ATTACH = """
+    SELECT
+        m.ROWID,
+        m.guid,
+        m.text,
+        m.date,
+        m.is_from_me,
+        m.service,
+        m.cache_has_attachments,
+        h.id as handle_id,
+        a.filename as attachment_filename,
+        a.mime_type as attachment_mime_type,
+        a.total_bytes as attachment_total_bytes,
+        a.transfer_name as attachment_transfer_name
+    FROM (
+        SELECT ROWID, guid, text, date, is_from_me, service, cache_has_attachments, handle_id
+        FROM message
+        WHERE ROWID > ?
+          AND (
+              (text IS NOT NULL AND text != '')
+              OR cache_has_attachments = 1
+          )
+        ORDER BY ROWID ASC
+        LIMIT ?
+    ) m
+    LEFT JOIN handle h ON m.handle_id = h.ROWID
+    LEFT JOIN message_attachment_join maj ON maj.message_id = m.ROWID
+    LEFT JOIN attachment a ON a.ROWID = maj.attachment_id
+    ORDER BY m.ROWID ASC
+"""
+
+# Single integer read deciding which of the two queries a poll needs
+_HAS_ATTACH_QUERY = """
+    SELECT EXISTS(SELECT 1 FROM message WHERE ROWID > ? AND cache_has_attachments = 1)
+"""
+
+
+class _ChatDBEventHandler(FileSystemEventHandler):
+    """Wakes the watcher when chat.db or its WAL/SHM files change."""
+
+    def __init__(self, db_path: Path, wake: Callable[[], None]):
+        self._names = {db_path.name, f"{db_path.name}-wal", f"{db_path.name}-shm"}
+        self._wake = wake
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        # Called on watchdog's observer thread
+        if Path(event.src_path).name in self._names:
+            self._wake()
+
 
 class iMessageWatcher:
     """
@@ -53,6 +140,7 @@ class iMessageWatcher:
         on_status_change: Callable[["StatusUpdate"], Awaitable[None]] | None = None,
         poll_interval: float = 2.0,
         db_path: Path | None = None,
+        use_fs_events: bool = False,
     ):
         """
         Initialize the watcher.
@@ -62,6 +150,8 @@ class iMessageWatcher:
             on_status_change: Async callback for delivery/read status updates
             poll_interval: Seconds between database polls
             db_path: Override the default chat.db path (for testing)
+            use_fs_events: Wake on chat.db file changes instead of polling
+                every poll_interval (falls back to polling if unavailable)
         """
         self.on_message = on_message
         self.on_status_change = on_status_change
@@ -70,6 +160,10 @@ class iMessageWatcher:
         self.last_rowid = 0
         self._running = False
         self._task: asyncio.Task | None = None
+        self._conn: sqlite3.Connection | None = None
+        self.use_fs_events = use_fs_events
+        self._observer: Observer | None = None
+        self._wake_event: asyncio.Event | None = None
         
         # Status tracker for delivery/read receipts
         from app.imessage.status_tracker import StatusTracker
@@ -77,17 +171,36 @@ class iMessageWatcher:
 
     def _get_connection(self) -> sqlite3.Connection:
         """Create a read-only connection to chat.db."""
-        if not self.db_path.exists():
+        # Read-only connection to avoid any locking issues. There's no exists()
+        # stat here; a missing file makes SQLite fail with "unable to open
+        # database file", which we surface as FileNotFoundError.
+        # check_same_thread=False: the poll loop runs fetches in worker threads,
+        # one at a time.
+        try:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        except sqlite3.OperationalError as e:
             raise FileNotFoundError(
                 f"Messages database not found at {self.db_path}. "
                 "Ensure Messages app has been used and Full Disk Access is enabled."
-            )
-
-        # Read-only connection to avoid any locking issues
-        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            ) from e
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = 1")
         return conn
 
+    def _ensure_connection(self) -> sqlite3.Connection:
+        """Return the long-lived connection, opening it if needed."""
+        if self._conn is None:
+            self._conn = self._get_connection()
+        return self._conn
+
+    def _close_connection(self) -> None:
+        """Close the long-lived connection; the next poll reopens it."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     def _get_latest_rowid(self, conn: sqlite3.Connection) -> int:
         """Get the highest message ROWID in the database."""
         cursor = conn.execute("SELECT MAX(ROWID) FROM message")
@@ -128,91 +241,76 @@ class iMessageWatcher:
         # Return original if we can't normalize
         return handle_id
 
-    def _fetch_attachments_for_message(self, conn: sqlite3.Connection, message_id: int) -> list[Attachment]:
-        """Fetch all attachments for a given message ROWID."""
-        query = """
-            SELECT 
-                a.filename,
-                a.mime_type,
-                a.total_bytes,
-                a.transfer_name
-            FROM attachment a
-            INNER JOIN message_attachment_join maj ON a.ROWID = maj.attachment_id
-            WHERE maj.message_id = ?
-        """
-        cursor = conn.execute(query, (message_id,))
-        attachments = []
-        
-        for row in cursor:
-            try:
-                filename = row["filename"]
-                if not filename:
-                    continue
-                
-                # macOS stores paths with ~ prefix, expand it
-                # The path in the database is like "~/Library/Messages/Attachments/..."
-                file_path = str(Path(filename.replace("~", str(Path.home()))))
-                
-                mime_type = row["mime_type"] or "application/octet-stream"
-                size_bytes = row["total_bytes"] or 0
-                transfer_name = row["transfer_name"]
-                
-                attachments.append(
-                    Attachment(
-                        filename=Path(filename).name,
-                        path=file_path,
-                        mime_type=mime_type,
-                        size_bytes=size_bytes,
-                        transfer_name=transfer_name,
-                    )
-                )
-            except Exception as e:
-                logger.warning(f"Failed to parse attachment for message {message_id}: {e}")
-        
-        return attachments
+    def _parse_attachment(self, row: sqlite3.Row, message_id: int) -> Attachment | None:
+        """Build an Attachment from the attachment columns of a joined message row."""
+        try:
+            filename = row["attachment_filename"]
+            if not filename:
+                return None
+
+            # macOS stores paths with ~ prefix, expand it
+            # The path in the database is like "~/Library/Messages/Attachments/..."
+            file_path = str(Path(filename.replace("~", str(Path.home()))))
+
+            return Attachment(
+                filename=Path(filename).name,
+                path=file_path,
+                mime_type=row["attachment_mime_type"] or "application/octet-stream",
+                size_bytes=row["attachment_total_bytes"] or 0,
+                transfer_name=row["attachment_transfer_name"],
+            )
+        except Exception as e:
+            logger.warning(f"Failed to parse attachment for message {message_id}: {e}")
+            return None
+
+    def _has_pending_attachments(self, conn: sqlite3.Connection) -> bool:
+        """Check whether any message after last_rowid carries attachments."""
+        cursor = conn.execute(_HAS_ATTACH_QUERY, (self.last_rowid,))
+        return bool(cursor.fetchone()[0])
 
     def _fetch_new_messages(self, conn: sqlite3.Connection) -> list[IncomingMessage]:
         """Fetch all messages with ROWID > last_rowid."""
-        # Include messages with attachments even if text is empty
-        query = """
-            SELECT 
-                m.ROWID,
-                m.guid,
-                m.text,
-                m.date,
-                m.is_from_me,
-                m.service,
-                m.cache_has_attachments,
-                h.id as handle_id
-            FROM message m
-            LEFT JOIN handle h ON m.handle_id = h.ROWID
-            WHERE m.ROWID > ?
-              AND (
-                  (m.text IS NOT NULL AND m.text != '')
-                  OR m.cache_has_attachments = 1
-              )
-            ORDER BY m.ROWID ASC
-            LIMIT 100
-        """
-        cursor = conn.execute(query, (self.last_rowid,))
-        messages = []
+        # One read transaction, so both statements see the same WAL snapshot:
+        # otherwise a message with attachments committed between them would
+        # come back from the text-only query and last_rowid would skip past
+        # its attachments for good
+        conn.execute("BEGIN")
+        try:
+            # Text-only batches (the common case) never touch the attachment tables
+            with_attachments = self._has_pending_attachments(conn)
+            query = _MSG_QUERY_WITH_ATTACH if with_attachments else _MSG_QUERY_NOATTACH
+            rows = conn.execute(query, (self.last_rowid, BATCH_SIZE)).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        messages: list[IncomingMessage] = []
+
+        for row in rows:
+            rowid = row["ROWID"]
+
+            # The attachment query yields one row per attachment; fold the
+            # extra rows into the message we just built
+            if with_attachments and messages and messages[-1].rowid == rowid:
+                attachment = self._parse_attachment(row, rowid)
+                if attachment:
+                    messages[-1].attachments.append(attachment)
+                continue
 
-        for row in cursor:
             try:
                 received_at = self._convert_apple_timestamp(row["date"])
 
                 # Determine if this is iMessage vs SMS
                 service = row["service"] or ""
                 is_imessage = "iMessage" in service
-                
-                # Fetch attachments if the message has any
+
                 attachments = []
-                if row["cache_has_attachments"]:
-                    attachments = self._fetch_attachments_for_message(conn, row["ROWID"])
+                if with_attachments:
+                    attachment = self._parse_attachment(row, rowid)
+                    if attachment:
+                        attachments.append(attachment)
 
                 messages.append(
                     IncomingMessage(
-                        rowid=row["ROWID"],
+                        rowid=rowid,
                         guid=row["guid"],
                         phone=self._normalize_phone(row["handle_id"] or "unknown"),
                         text=row["text"] or "",  # May be empty for attachment-only messages
@@ -223,21 +321,71 @@ class iMessageWatcher:
                     )
                 )
             except Exception as e:
-                logger.warning(f"Failed to parse message ROWID={row['ROWID']}: {e}")
+                logger.warning(f"Failed to parse message ROWID={rowid}: {e}")
 
         return messages
 
+    def _start_fs_events(self) -> None:
+        """Watch the Messages directory so writes to chat.db wake the poll loop."""
+        loop = asyncio.get_running_loop()
+        wake_event = asyncio.Event()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(wake_event.set)
+
+        try:
+            observer = Observer()
+            observer.schedule(
+                _ChatDBEventHandler(self.db_path, wake),
+                str(self.db_path.parent),
+                recursive=False,
+            )
+            observer.start()
+        except Exception as e:
+            logger.warning(f"File-system events unavailable ({e}), polling every {self.poll_interval}s")
+            return
+
+        self._observer = observer
+        self._wake_event = wake_event
+
+    def _stop_fs_events(self) -> None:
+        """Stop the file-system observer, if running."""
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+            self._wake_event = None
+
+    async def _wait_for_changes(self) -> None:
+        """Sleep until chat.db changes (or the fallback interval passes)."""
+        if not self._wake_event:
+            await asyncio.sleep(self.poll_interval)
+            return
+
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=FS_EVENTS_FALLBACK_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        # Events that arrive while we query set it again and trigger one more pass
+        self._wake_event.clear()
+
     async def _poll_loop(self):
         """Main polling loop."""
-        logger.info(f"Starting iMessage watcher, polling every {self.poll_interval}s")
+        if self._wake_event:
+            logger.info("Starting iMessage watcher, waking on chat.db changes")
+        else:
+            logger.info(f"Starting iMessage watcher, polling every {self.poll_interval}s")
+
+        drain_count = 0
 
         while self._running:
-            conn = None
+            drained = True
             try:
-                conn = self._get_connection()
+                conn = self._ensure_connection()
                 
-                # 1. Fetch and process new inbound messages
-                messages = self._fetch_new_messages(conn)
+                # 1. Fetch and process new inbound messages (off the event loop)
+                messages = await asyncio.to_thread(self._fetch_new_messages, conn)
+                drained = len(messages) < BATCH_SIZE
+                drain_count += len(messages)
 
                 for msg in messages:
                     # Update last_rowid immediately to avoid reprocessing on error
@@ -260,14 +408,21 @@ class iMessageWatcher:
                 continue
             except sqlite3.Error as e:
                 logger.error(f"Database error: {e}")
+                # Drop the connection so a replaced/locked file gets a fresh handle
+                self._close_connection()
             except Exception as e:
                 logger.error(f"Unexpected error in poll loop: {e}")
-            finally:
-                # CRITICAL: Always close the connection to avoid FD leak
-                if conn:
-                    conn.close()
 
-            await asyncio.sleep(self.poll_interval)
+            # Backlog (e.g. after the Mac wakes): fetch the next batch right
+            # away, only yielding briefly every MAX_DRAIN_MESSAGES
+            if not drained:
+                if drain_count >= MAX_DRAIN_MESSAGES:
+                    drain_count = 0
+                    await asyncio.sleep(0)
+                continue
+
+            drain_count = 0
+            await self._wait_for_changes()
 
     async def start(self, skip_historical: bool = True):
         """
@@ -282,12 +437,18 @@ class iMessageWatcher:
 
         self._running = True
 
+        # One-time diagnostic for first runs; the poll loop doesn't stat the file
+        if not self.db_path.exists():
+            logger.warning(
+                f"Messages database not found at {self.db_path}. "
+                "Ensure Messages app has been used and Full Disk Access is enabled."
+            )
+
         # Initialize last_rowid
         if skip_historical:
-            conn = None
             try:
-                conn = self._get_connection()
-                self.last_rowid = self._get_latest_rowid(conn)
+                # Opens the connection the poll loop keeps using
+                self.last_rowid = self._get_latest_rowid(self._ensure_connection())
                 logger.info(f"Skipping historical messages, starting from ROWID={self.last_rowid}")
             except FileNotFoundError:
                 logger.warning("Database not found, will retry in poll loop")
@@ -296,9 +457,10 @@ class iMessageWatcher:
                 logger.warning(f"Could not connect to chat.db: {e}")
                 logger.warning("Watcher will retry in poll loop. Grant Full Disk Access to fix.")
                 self.last_rowid = 0
-            finally:
-                if conn:
-                    conn.close()
+                self._close_connection()
+
+        if self.use_fs_events:
+            self._start_fs_events()
 
         self._task = asyncio.create_task(self._poll_loop())
 
@@ -309,6 +471,8 @@ class iMessageWatcher:
         if self._task:
             self._task.cancel()
             self._task = None
+        self._stop_fs_events()
+        self._close_connection()
 
     @property
     def is_running(self) -> bool:
@@ -10,22 +10,28 @@ Run with:
 
 import asyncio
 import base64
+import hmac
 import logging
 import os
 import platform
+import secrets
+import sqlite3
 import time
-import uuid
 from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, Header, HTTPException, status
+import orjson
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 
 from app.config import settings
 from app.imessage import IncomingMessage, iMessageSender, iMessageWatcher, MockiMessageWatcher, MockiMessageSender, StatusUpdate
 from app.webhooks import NightlineClient, SendAttachmentRequest, SendMessageRequest, SendMessageResponse
-from app.services.queue import MessageQueue
+from app.services.queue import MessageQueue, SqliteBackend
+from shared.static import NegotiatedGZipMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -34,13 +40,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 12-hex-char random ids (6 random bytes) for sent messages and attachment files
+_gen_id = secrets.token_hex
+
+# Monotonic clock for durations (uptime, "seconds ago"); immune to NTP jumps
+_perf = time.perf_counter
+
 # Global state
-_start_time: float = 0
+_start_time: float = 0  # _perf() at startup
 _watcher: iMessageWatcher | None = None
 _sender: iMessageSender | None = None
 _nightline_client: NightlineClient | None = None
 _message_queue: MessageQueue | None = None
 _cleanup_task: asyncio.Task | None = None
+_probe_task: asyncio.Task | None = None
+
+# How often to probe Nightline when nothing else has reached it recently
+_NIGHTLINE_PROBE_INTERVAL = 30
 
 # Attachment storage directory (persistent, not temp)
 # Files are cleaned up by age, not immediately after send
@@ -105,6 +121,33 @@ async def _attachment_cleanup_loop():
             logger.exception(f"Error in attachment cleanup: {e}")
 
 
+async def _nightline_probe_loop():
+    """
+    Background task that keeps Nightline connectivity status fresh.
+    
+    /health reports the client's last successful request instead of making
+    its own upstream call. Deliveries refresh that on their own, so this only
+    probes when nothing has succeeded within the last interval.
+    """
+    logger.info("Nightline probe task started")
+    
+    while True:
+        try:
+            await asyncio.sleep(_NIGHTLINE_PROBE_INTERVAL)
+            
+            last = _nightline_client.last_success_at if _nightline_client else None
+            if _nightline_client and (
+                last is None or time.monotonic() - last >= _NIGHTLINE_PROBE_INTERVAL
+            ):
+                await _nightline_client.health_check()
+                
+        except asyncio.CancelledError:
+            logger.info("Nightline probe task stopped")
+            break
+        except Exception as e:
+            logger.exception(f"Error in Nightline probe: {e}")
+
+
 # Pause state
 # - pause_inbound: Won't receive/forward any messages (completely paused)
 # - pause_outbound: Can receive messages but won't send any out to contacts
@@ -115,69 +158,60 @@ _pause_outbound: bool = False
 _outbound_queue: list[dict] = []
 
 # Stats
-_stats = {
-    "messages_received": 0,
-    "messages_sent": 0,
-    "messages_forwarded": 0,
-    "messages_failed": 0,
-    "messages_held": 0,  # Messages held due to pause_outbound
-    "status_updates_sent": 0,  # Delivery/read status updates
-    "last_message_at": None,
-}
+@dataclass(slots=True)
+class BridgeStats:
+    """Counters reported under "stats" in /health."""
+
+    messages_received: int = 0
+    messages_sent: int = 0
+    messages_forwarded: int = 0
+    messages_failed: int = 0
+    messages_held: int = 0  # Messages held due to pause_outbound
+    status_updates_sent: int = 0  # Delivery/read status updates
+    last_message_perf: float | None = None  # _perf(), for "seconds ago"
 
 
-async def _deliver_to_nightline(payload: dict) -> bool:
-    """Deliver a message payload to Nightline (used by queue)."""
+_stats = BridgeStats()
+
+
+async def _deliver_to_nightline(payload: bytes) -> bool:
+    """Deliver an already-encoded message payload to Nightline (used by queue)."""
     if not _nightline_client:
         return False
-    
-    client_id = settings.nightline_client_id
-    if not client_id:
-        logger.error("NIGHTLINE_CLIENT_ID not configured - cannot deliver message")
-        return False
-    
-    try:
-        client = await _nightline_client._get_client()
-        url = f"{_nightline_client.base_url}/webhooks/iphone-bridge/{client_id}/message"
-        response = await client.post(url, json=payload)
-        return response.status_code == 200
-    except Exception as e:
-        logger.error(f"Delivery failed: {e}")
-        return False
+    return await _nightline_client.deliver_payload(payload)
 
 
 async def _handle_incoming_message(message: IncomingMessage):
     """Callback for when a new message is received."""
-    global _stats
-    
     # Check if inbound is paused
     if _pause_inbound:
         logger.info(f"PAUSED (inbound): Ignoring message from {message.phone}")
         return
     
-    _stats["messages_received"] += 1
-    _stats["last_message_at"] = time.time()
+    _stats.messages_received += 1
+    _stats.last_message_perf = _perf()
     
     logger.info(f"Processing incoming message: {message}")
 
     if _nightline_client:
-        payload = {
-            "event": "message.received",
-            "phone": message.phone,
-            "text": message.text,
-            "received_at": message.received_at.isoformat(),
-            "message_id": message.guid,
-            "is_imessage": message.is_imessage,
-        }
+        success = None
+        payload = None
+        if message.attachments and settings.attachment_upload == "multipart":
+            success = await _nightline_client.forward_multipart(message)
         
-        success = await _nightline_client.forward_message(message)
+        if success is None:
+            # Built once: posted now and, on failure, queued for retry unchanged
+            payload = await _nightline_client.build_payload_async(message)
+            success = await _nightline_client.forward_payload(message, payload)
         
         if success:
-            _stats["messages_forwarded"] += 1
+            _stats.messages_forwarded += 1
         else:
-            _stats["messages_failed"] += 1
-            # Queue for retry
+            _stats.messages_failed += 1
+            # Queue for retry (the queue always redelivers as JSON)
             if _message_queue:
+                if payload is None:
+                    payload = await _nightline_client.build_payload_async(message)
                 _message_queue.enqueue(message.guid, payload)
     else:
         logger.warning("Nightline client not initialized, message not forwarded")
@@ -185,14 +219,12 @@ async def _handle_incoming_message(message: IncomingMessage):
 
 async def _handle_status_change(update: StatusUpdate):
     """Callback for delivery/read status changes on sent messages."""
-    global _stats
-    
     logger.info(f"Status update: {update.status} for message to {update.phone}")
     
     if _nightline_client:
         success = await _nightline_client.send_status_update(update)
         if success:
-            _stats["status_updates_sent"] += 1
+            _stats.status_updates_sent += 1
     else:
         logger.warning("Nightline client not initialized, status update not sent")
 
@@ -200,10 +232,10 @@ async def _handle_status_change(update: StatusUpdate):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown logic."""
-    global _start_time, _watcher, _sender, _nightline_client, _message_queue, _cleanup_task
+    global _start_time, _watcher, _sender, _nightline_client, _message_queue, _cleanup_task, _probe_task
 
     # Startup
-    _start_time = time.time()
+    _start_time = _perf()
     
     if settings.mock_mode:
         logger.info("🧪 Starting iPhone Bridge in MOCK MODE (no real iMessage)")
@@ -220,23 +252,35 @@ async def lifespan(app: FastAPI):
             on_message=_handle_incoming_message,
             poll_interval=settings.poll_interval,
         )
+
+        from app.routes import mock as mock_routes
+        mock_routes.bind(_watcher, _sender)
     else:
         _sender = iMessageSender()
         _watcher = iMessageWatcher(
             on_message=_handle_incoming_message,
             on_status_change=_handle_status_change,  # Track delivery/read receipts
             poll_interval=settings.poll_interval,
+            use_fs_events=settings.use_fs_events,
         )
     
     _nightline_client = NightlineClient()
     
     # Initialize message queue
-    _message_queue = MessageQueue(deliver_fn=_deliver_to_nightline)
+    _message_queue = MessageQueue(
+        deliver_fn=_deliver_to_nightline,
+        backend=(
+            SqliteBackend(settings.queue_db_file) if settings.queue_backend == "sqlite" else None
+        ),
+    )
     await _message_queue.start()
 
     # Start attachment cleanup task
     _cleanup_task = asyncio.create_task(_attachment_cleanup_loop())
 
+    # Keep Nightline connectivity status fresh for /health
+    _probe_task = asyncio.create_task(_nightline_probe_loop())
+
     # Start the message watcher
     await _watcher.start(skip_historical=not settings.process_historical)
 
@@ -257,34 +301,87 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down iPhone Bridge...")
 
-    # Stop cleanup task
-    if _cleanup_task:
-        _cleanup_task.cancel()
-        try:
-            await _cleanup_task
-        except asyncio.CancelledError:
-            pass
-
-    if _message_queue:
-        _message_queue.stop()
+    # Stop background tasks
+    for task in (_cleanup_task, _probe_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
+    # Watcher first, so nothing is enqueued once the queue has closed
     if _watcher:
         _watcher.stop()
 
+    if _message_queue:
+        await _message_queue.stop()
+
     if _nightline_client:
         await _nightline_client.close()
 
     logger.info("iPhone Bridge stopped")
 
 
+# --- Authentication ---
+
+# Encoded once; compared in constant time on every authenticated request
+_WEBHOOK_SECRET_BYTES: bytes = settings.webhook_secret.encode("utf-8")
+
+# Endpoints that require X-Bridge-Secret
+_AUTH_PATHS = frozenset({"/send", "/send-attachment"})
+_AUTH_PREFIX = "/control/"
+
+_UNAUTHORIZED_BODY = b'{"detail":"Invalid or missing X-Bridge-Secret header"}'
+
+
+class BridgeSecretMiddleware:
+    """
+    Pure ASGI middleware that checks X-Bridge-Secret on authenticated paths.
+
+    Reads the raw header bytes from the scope and answers 401 itself, before
+    routing or dependency resolution run.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] != "OPTIONS":
+            path = scope["path"]
+            if path in _AUTH_PATHS or path.startswith(_AUTH_PREFIX):
+                secret = None
+                for name, value in scope["headers"]:
+                    if name == b"x-bridge-secret":
+                        secret = value
+                        break
+                if not secret or not hmac.compare_digest(secret, _WEBHOOK_SECRET_BYTES):
+                    await send({
+                        "type": "http.response.start",
+                        "status": status.HTTP_401_UNAUTHORIZED,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(_UNAUTHORIZED_BODY)).encode()),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": _UNAUTHORIZED_BODY})
+                    return
+
+        await self.app(scope, receive, send)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="iPhone Bridge",
     description="Mac Mini bridge for iPhone iMessage/SMS forwarding to Nightline",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
+# Auth is added first so CORS wraps it and 401s still carry CORS headers
+app.add_middleware(BridgeSecretMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -294,19 +391,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (/health, /status); tiny ones like /ping stay as-is
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=512, compresslevel=5)
 
+# Mock-mode test endpoints (/test/*) only exist when MOCK_MODE=true
+if settings.mock_mode:
+    from app.routes.mock import router as mock_router
 
-# --- Authentication ---
+    app.include_router(mock_router)
 
-async def verify_webhook_secret(
-    x_bridge_secret: str | None = Header(None, alias="X-Bridge-Secret"),
-):
-    """Verify the webhook secret for authenticated endpoints."""
-    if not x_bridge_secret or x_bridge_secret != settings.webhook_secret:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing X-Bridge-Secret header",
-        )
 
 
 # --- Health Endpoint (for UptimeRobot) ---
@@ -335,23 +428,58 @@ class HealthResponse(BaseModel):
     system: dict
 
 
-def _check_chat_db_access() -> tuple[bool, str]:
-    """Check if we can access chat.db."""
+# Last chat.db access check as (monotonic timestamp, ok, message). Monitoring
+# probes hit /health often; re-opening chat.db for each one is wasted I/O.
+_chat_db_cache: tuple[float, bool, str] | None = None
+_CHAT_DB_TTL = 5.0
+
+
+# Read-only probe connection kept open between checks; reset on any error
+_chat_db_probe: sqlite3.Connection | None = None
+
+
+def _check_chat_db_access_sync() -> tuple[bool, str]:
+    """Check if we can access chat.db. Blocking; run it in a worker thread."""
+    global _chat_db_probe
+
     chat_db = Path.home() / "Library" / "Messages" / "chat.db"
-    if not chat_db.exists():
-        return False, "chat.db not found"
     try:
-        # Try to open it
-        import sqlite3
-        conn = sqlite3.connect(f"file:{chat_db}?mode=ro", uri=True)
-        conn.close()
+        if not chat_db.exists():
+            raise FileNotFoundError("chat.db not found")
+        if _chat_db_probe is None:
+            _chat_db_probe = sqlite3.connect(
+                f"file:{chat_db}?mode=ro", uri=True, check_same_thread=False
+            )
+        # Reads the database header, so it fails if access was revoked
+        _chat_db_probe.execute("PRAGMA schema_version").fetchone()
         return True, "ok"
     except Exception as e:
+        # Don't keep a handle to a deleted/replaced file around
+        if _chat_db_probe is not None:
+            _chat_db_probe.close()
+            _chat_db_probe = None
         return False, str(e)
 
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
+async def _check_chat_db_access() -> tuple[bool, str]:
+    """Check if we can access chat.db (cached for _CHAT_DB_TTL seconds)."""
+    global _chat_db_cache
+
+    now = time.monotonic()
+    if _chat_db_cache and now - _chat_db_cache[0] < _CHAT_DB_TTL:
+        return _chat_db_cache[1], _chat_db_cache[2]
+
+    # The sqlite open can block on disk I/O; keep it off the event loop
+    ok, msg = await asyncio.to_thread(_check_chat_db_access_sync)
+    _chat_db_cache = (now, ok, msg)
+    return ok, msg
+
+
+# HealthResponse documents the schema only; the payload is built as a plain
+# dict and encoded straight to bytes with orjson, skipping response_model
+# validation.
+@app.get("/health", responses={200: {"model": HealthResponse}})
+async def health_check() -> Response:
     """
     Comprehensive health check for monitoring.
     
@@ -361,19 +489,61 @@ async def health_check():
     - "degraded": Some components have issues but bridge is operational
     - "unhealthy": Critical failure
     """
-    now = time.time()
+    return Response(content=await _get_health(), media_type="application/json")
+
+
+# Host details for /health; constant for the life of the process.
+# (A plain dict rather than MappingProxyType, which orjson can't serialize.)
+_SYSTEM_INFO = {
+    "hostname": platform.node(),
+    "platform": platform.platform(),
+    "python_version": platform.python_version(),
+}
+
+
+# Last health payload as (monotonic timestamp, encoded JSON). /health and
+# /status are polled by several monitors; each fresh payload costs a chat.db
+# check and an upstream Nightline health request. The bytes are cached, so
+# hits within the TTL don't even re-serialize.
+_health_cache: tuple[float, bytes] | None = None
+_HEALTH_TTL = 2.0
+_health_lock = asyncio.Lock()
+
+
+async def _get_health() -> bytes:
+    """Return the health payload, recomputing it at most once per _HEALTH_TTL."""
+    global _health_cache
+
+    if _health_cache and time.monotonic() - _health_cache[0] < _HEALTH_TTL:
+        return _health_cache[1]
+
+    # Single-flight: concurrent probes wait for one computation
+    async with _health_lock:
+        if _health_cache and time.monotonic() - _health_cache[0] < _HEALTH_TTL:
+            return _health_cache[1]
+        # Queue stats are keyed by attempt count (int keys)
+        payload = orjson.dumps(await _compute_health(), option=orjson.OPT_NON_STR_KEYS)
+        _health_cache = (time.monotonic(), payload)
+        return payload
+
+
+def _invalidate_health() -> None:
+    """Drop the cached health payload after a state change (pause/resume)."""
+    global _health_cache
+    _health_cache = None
+
+
+async def _compute_health() -> dict:
+    """Build the /health payload."""
+    now = _perf()
     uptime = now - _start_time
     
     # Check chat.db access
-    chat_db_ok, chat_db_msg = _check_chat_db_access()
+    chat_db_ok, chat_db_msg = await _check_chat_db_access()
     
-    # Check Nightline connectivity
-    nightline_ok = False
-    if _nightline_client:
-        try:
-            nightline_ok = await _nightline_client.health_check()
-        except:
-            pass
+    # Nightline connectivity: last known status (kept fresh by deliveries
+    # and the probe task), not an upstream request per probe
+    nightline_ok = _nightline_client.is_connected if _nightline_client else False
     
     # Determine overall status
     watcher_ok = _watcher.is_running if _watcher else False
@@ -388,51 +558,46 @@ async def health_check():
     else:
         overall_status = "healthy"
     
-    return HealthResponse(
-        status=overall_status,
-        version="0.1.0",
-        uptime_seconds=uptime,
-        pause_inbound=_pause_inbound,
-        pause_outbound=_pause_outbound,
-        outbound_queue_size=len(_outbound_queue),
-        watcher={
+    # Snapshot the counters once
+    stats = asdict(_stats)
+    last_message_perf = stats.pop("last_message_perf")
+    
+    return {
+        "status": overall_status,
+        "version": "0.1.0",
+        "uptime_seconds": uptime,
+        "pause_inbound": _pause_inbound,
+        "pause_outbound": _pause_outbound,
+        "outbound_queue_size": len(_outbound_queue),
+        "watcher": {
             "running": watcher_ok,
             "last_rowid": _watcher.last_rowid if _watcher else 0,
             "poll_interval_seconds": settings.poll_interval,
             "chat_db_accessible": chat_db_ok,
             "chat_db_status": chat_db_msg,
         },
-        sender={
+        "sender": {
             "available": _sender is not None,
         },
-        nightline={
+        "nightline": {
             "url": settings.nightline_server_url,
             "connected": nightline_ok,
         },
-        queue={
+        "queue": {
             "running": _message_queue.is_running if _message_queue else False,
             **(_message_queue.get_stats() if _message_queue else {"size": 0}),
         },
-        stats={
-            "messages_received": _stats["messages_received"],
-            "messages_sent": _stats["messages_sent"],
-            "messages_forwarded": _stats["messages_forwarded"],
-            "messages_failed": _stats["messages_failed"],
-            "messages_held": _stats["messages_held"],
-            "status_updates_sent": _stats["status_updates_sent"],
+        "stats": {
+            **stats,
             "tracking_count": _watcher.status_tracker.tracking_count if _watcher and hasattr(_watcher, 'status_tracker') else 0,
             "last_message_seconds_ago": (
-                now - _stats["last_message_at"] 
-                if _stats["last_message_at"] 
+                now - last_message_perf
+                if last_message_perf
                 else None
             ),
         },
-        system={
-            "hostname": platform.node(),
-            "platform": platform.platform(),
-            "python_version": platform.python_version(),
-        },
-    )
+        "system": _SYSTEM_INFO,
+    }
 
 
 # --- Simple health check for load balancers ---
@@ -448,7 +613,6 @@ async def ping():
 @app.post(
     "/send",
     response_model=SendMessageResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def send_message(request: SendMessageRequest):
     """
@@ -458,7 +622,7 @@ async def send_message(request: SendMessageRequest):
     
     If outbound is paused, message will be queued and sent when resumed.
     """
-    global _stats, _outbound_queue
+    global _outbound_queue
     
     if not _sender:
         raise HTTPException(
@@ -470,14 +634,14 @@ async def send_message(request: SendMessageRequest):
 
     # Check if outbound is paused
     if _pause_outbound:
-        message_id = f"bridge-{uuid.uuid4().hex[:12]}"
+        message_id = f"bridge-{_gen_id(6)}"
         _outbound_queue.append({
             "id": message_id,
             "phone": request.phone,
             "text": request.text,
             "queued_at": time.time(),
         })
-        _stats["messages_held"] += 1
+        _stats.messages_held += 1
         logger.info(f"PAUSED (outbound): Queued message to {request.phone} (queue size: {len(_outbound_queue)})")
         return SendMessageResponse(
             success=True,
@@ -488,8 +652,8 @@ async def send_message(request: SendMessageRequest):
     response = await _sender.send(request.phone, request.text)
 
     if response.success:
-        _stats["messages_sent"] += 1
-        message_id = f"bridge-{uuid.uuid4().hex[:12]}"
+        _stats.messages_sent += 1
+        message_id = f"bridge-{_gen_id(6)}"
         
         # Track for delivery/read receipts (iMessage only - SMS doesn't support this)
         if _watcher and hasattr(_watcher, 'track_sent_message'):
@@ -509,7 +673,6 @@ async def send_message(request: SendMessageRequest):
 @app.post(
     "/send-attachment",
     response_model=SendMessageResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def send_attachment(request: SendAttachmentRequest):
     """
@@ -523,8 +686,6 @@ async def send_attachment(request: SendAttachmentRequest):
     Files are written to a persistent directory and cleaned up by age
     (after 5 minutes) to avoid race conditions with iMessage reading.
     """
-    global _stats
-    
     if not _sender:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -542,7 +703,7 @@ async def send_attachment(request: SendAttachmentRequest):
     # Write to persistent attachments directory (cleaned up by background task)
     # This avoids race conditions with iMessage reading the file
     suffix = Path(request.filename).suffix or ""
-    unique_name = f"{uuid.uuid4().hex[:12]}{suffix}"
+    unique_name = f"{_gen_id(6)}{suffix}"
     file_path = _get_attachments_dir() / unique_name
     
     file_path.write_bytes(file_data)
@@ -556,8 +717,8 @@ async def send_attachment(request: SendAttachmentRequest):
     )
 
     if response.success:
-        _stats["messages_sent"] += 1
-        message_id = f"bridge-{uuid.uuid4().hex[:12]}"
+        _stats.messages_sent += 1
+        message_id = f"bridge-{_gen_id(6)}"
         # File will be cleaned up by background task after 5 minutes
         return SendMessageResponse(success=True, message_id=message_id)
     else:
@@ -600,7 +761,6 @@ class PauseResponse(BaseModel):
 @app.post(
     "/control/pause",
     response_model=PauseResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def pause_bridge(request: PauseRequest):
     """
@@ -615,6 +775,7 @@ async def pause_bridge(request: PauseRequest):
     
     _pause_inbound = request.pause_inbound
     _pause_outbound = request.pause_outbound
+    _invalidate_health()
     
     states = []
     if _pause_inbound:
@@ -636,7 +797,6 @@ async def pause_bridge(request: PauseRequest):
 @app.post(
     "/control/resume",
     response_model=PauseResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def resume_bridge(send_queued: bool = True):
     """
@@ -648,10 +808,11 @@ async def resume_bridge(send_queued: bool = True):
     
     Requires X-Bridge-Secret header.
     """
-    global _pause_inbound, _pause_outbound, _outbound_queue, _stats
+    global _pause_inbound, _pause_outbound, _outbound_queue
     
     _pause_inbound = False
     _pause_outbound = False
+    _invalidate_health()
     
     sent_count = 0
     failed_count = 0
@@ -663,7 +824,7 @@ async def resume_bridge(send_queued: bool = True):
             response = await _sender.send(queued_msg["phone"], queued_msg["text"])
             if response.success:
                 sent_count += 1
-                _stats["messages_sent"] += 1
+                _stats.messages_sent += 1
             else:
                 failed_count += 1
                 logger.error(f"Failed to send queued message to {queued_msg['phone']}: {response.error}")
@@ -688,7 +849,6 @@ class ClearQueueResponse(BaseModel):
 @app.post(
     "/control/clear-queue",
     response_model=ClearQueueResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def clear_outbound_queue():
     """
@@ -702,6 +862,7 @@ async def clear_outbound_queue():
     
     count = len(_outbound_queue)
     _outbound_queue = []
+    _invalidate_health()
     
     logger.info(f"Cleared {count} messages from outbound queue")
     
@@ -723,7 +884,6 @@ class ControlStatusResponse(BaseModel):
 @app.get(
     "/control/status",
     response_model=ControlStatusResponse,
-    dependencies=[Depends(verify_webhook_secret)],
 )
 async def control_status():
     """
@@ -748,587 +908,15 @@ async def control_status():
     )
 
 
-# =====================================================
-# MOCK MODE TEST ENDPOINTS
-# Only available when MOCK_MODE=true
-# =====================================================
-
-
-class InjectMessageRequest(BaseModel):
-    """Request to inject a test message."""
-    phone: str
-    text: str
-    is_imessage: bool = True
-
-
-class InjectMessageResponse(BaseModel):
-    """Response after injecting a test message."""
-    success: bool
-    message_id: str | None = None
-    error: str | None = None
-
-
-@app.post("/test/inject", response_model=InjectMessageResponse)
-async def inject_test_message(request: InjectMessageRequest):
-    """
-    [MOCK MODE ONLY] Inject a test message as if received from a phone.
-    
-    This simulates receiving an iMessage/SMS so you can test the full flow
-    without a real iPhone connected.
-    """
-    if not settings.mock_mode:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This endpoint is only available in mock mode. Set MOCK_MODE=true",
-        )
-    
-    if not isinstance(_watcher, MockiMessageWatcher):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Mock watcher not initialized",
-        )
-    
-    try:
-        message = await _watcher.inject_message(
-            phone=request.phone,
-            text=request.text,
-            is_imessage=request.is_imessage,
-        )
-        return InjectMessageResponse(success=True, message_id=message.guid)
-    except Exception as e:
-        logger.error(f"Failed to inject message: {e}")
-        return InjectMessageResponse(success=False, error=str(e))
-
-
-@app.get("/test/sent")
-async def get_sent_messages():
-    """
-    [MOCK MODE ONLY] Get all messages that would have been sent via iMessage.
-    
-    Returns the list of messages that the mock sender has logged.
-    """
-    if not settings.mock_mode:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This endpoint is only available in mock mode. Set MOCK_MODE=true",
-        )
-    
-    if not isinstance(_sender, MockiMessageSender):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Mock sender not initialized",
-        )
-    
-    return {
-        "messages": _sender.get_sent_messages(),
-        "count": len(_sender.get_sent_messages()),
-    }
-
-
-@app.get("/test/received")
-async def get_received_messages():
-    """
-    [MOCK MODE ONLY] Get all messages that have been injected/received.
-    
-    Returns the list of messages that have been injected for testing.
-    """
-    if not settings.mock_mode:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This endpoint is only available in mock mode. Set MOCK_MODE=true",
-        )
-    
-    if not isinstance(_watcher, MockiMessageWatcher):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Mock watcher not initialized",
-        )
-    
-    messages = _watcher.get_message_history()
-    return {
-        "messages": [
-            {
-                "id": m.guid,
-                "phone": m.phone,
-                "text": m.text,
-                "received_at": m.received_at.isoformat(),
-                "is_imessage": m.is_imessage,
-            }
-            for m in messages
-        ],
-        "count": len(messages),
-    }
-
-
-@app.delete("/test/clear")
-async def clear_test_data():
-    """
-    [MOCK MODE ONLY] Clear all test message data.
-    """
-    if not settings.mock_mode:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This endpoint is only available in mock mode. Set MOCK_MODE=true",
-        )
-    
-    if isinstance(_sender, MockiMessageSender):
-        _sender.clear_sent_messages()
-    
-    return {"success": True, "message": "Test data cleared"}
-
-
-# Test UI - simple HTML interface for manual testing
-TEST_UI_HTML = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>iPhone Bridge Test Console</title>
-    <style>
-        :root {
-            --bg: #0a0a0f;
-            --surface: #12121a;
-            --border: #2a2a3a;
-            --text: #e0e0e0;
-            --text-dim: #808090;
-            --accent: #00d4aa;
-            --accent-dim: #00a080;
-            --sent: #3b82f6;
-            --received: #10b981;
-            --error: #ef4444;
-        }
-        
-        * { box-sizing: border-box; margin: 0; padding: 0; }
-        
-        body {
-            font-family: 'SF Mono', 'Fira Code', 'Consolas', monospace;
-            background: var(--bg);
-            color: var(--text);
-            min-height: 100vh;
-            padding: 2rem;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        
-        header {
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-            margin-bottom: 2rem;
-            padding-bottom: 1rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        header h1 {
-            font-size: 1.5rem;
-            font-weight: 600;
-            color: var(--accent);
-        }
-        
-        .badge {
-            background: var(--accent);
-            color: var(--bg);
-            padding: 0.25rem 0.75rem;
-            border-radius: 4px;
-            font-size: 0.75rem;
-            font-weight: 700;
-            text-transform: uppercase;
-        }
-        
-        .grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 2rem;
-        }
-        
-        @media (max-width: 900px) {
-            .grid { grid-template-columns: 1fr; }
-        }
-        
-        .panel {
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            overflow: hidden;
-        }
-        
-        .panel-header {
-            padding: 1rem;
-            border-bottom: 1px solid var(--border);
-            font-weight: 600;
-            font-size: 0.875rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            color: var(--text-dim);
-        }
-        
-        .panel-body {
-            padding: 1rem;
-        }
-        
-        .form-group {
-            margin-bottom: 1rem;
-        }
-        
-        label {
-            display: block;
-            font-size: 0.75rem;
-            color: var(--text-dim);
-            margin-bottom: 0.5rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }
-        
-        input, textarea {
-            width: 100%;
-            padding: 0.75rem;
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            color: var(--text);
-            font-family: inherit;
-            font-size: 0.875rem;
-        }
-        
-        input:focus, textarea:focus {
-            outline: none;
-            border-color: var(--accent);
-        }
-        
-        textarea {
-            resize: vertical;
-            min-height: 100px;
-        }
-        
-        button {
-            background: var(--accent);
-            color: var(--bg);
-            border: none;
-            padding: 0.75rem 1.5rem;
-            border-radius: 4px;
-            font-family: inherit;
-            font-size: 0.875rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: background 0.2s;
-        }
-        
-        button:hover {
-            background: var(--accent-dim);
-        }
-        
-        button:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-        
-        .messages {
-            max-height: 400px;
-            overflow-y: auto;
-        }
-        
-        .message {
-            padding: 0.75rem;
-            border-radius: 4px;
-            margin-bottom: 0.5rem;
-            font-size: 0.875rem;
-        }
-        
-        .message.sent {
-            background: rgba(59, 130, 246, 0.15);
-            border-left: 3px solid var(--sent);
-        }
-        
-        .message.received {
-            background: rgba(16, 185, 129, 0.15);
-            border-left: 3px solid var(--received);
-        }
-        
-        .message-header {
-            display: flex;
-            justify-content: space-between;
-            font-size: 0.75rem;
-            color: var(--text-dim);
-            margin-bottom: 0.5rem;
-        }
-        
-        .message-text {
-            word-break: break-word;
-        }
-        
-        .empty {
-            color: var(--text-dim);
-            font-style: italic;
-            text-align: center;
-            padding: 2rem;
-        }
-        
-        .status {
-            display: flex;
-            gap: 1rem;
-            padding: 1rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            margin-bottom: 2rem;
-            font-size: 0.875rem;
-        }
-        
-        .status-item {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-        
-        .status-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: var(--received);
-        }
-        
-        .status-dot.error {
-            background: var(--error);
-        }
-        
-        .toast {
-            position: fixed;
-            bottom: 2rem;
-            right: 2rem;
-            padding: 1rem 1.5rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            animation: slideIn 0.3s ease;
-        }
-        
-        .toast.success { border-color: var(--received); }
-        .toast.error { border-color: var(--error); }
-        
-        @keyframes slideIn {
-            from { transform: translateY(1rem); opacity: 0; }
-            to { transform: translateY(0); opacity: 1; }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>📱 iPhone Bridge</h1>
-            <span class="badge">Mock Mode</span>
-        </header>
-        
-        <div class="status" id="status">
-            <div class="status-item">
-                <span class="status-dot" id="status-dot"></span>
-                <span id="status-text">Checking...</span>
-            </div>
-            <div class="status-item" id="nightline-status"></div>
-        </div>
-        
-        <div class="grid">
-            <div class="panel">
-                <div class="panel-header">📥 Inject Incoming Message</div>
-                <div class="panel-body">
-                    <form id="inject-form">
-                        <div class="form-group">
-                            <label for="phone">Phone Number</label>
-                            <input type="text" id="phone" placeholder="+15551234567" required>
-                        </div>
-                        <div class="form-group">
-                            <label for="text">Message Text</label>
-                            <textarea id="text" placeholder="Enter test message..." required></textarea>
-                        </div>
-                        <button type="submit">Send Test Message →</button>
-                    </form>
-                </div>
-            </div>
-            
-            <div class="panel">
-                <div class="panel-header">📤 Outgoing Messages (Mock)</div>
-                <div class="panel-body">
-                    <div class="messages" id="sent-messages">
-                        <div class="empty">No messages sent yet</div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="panel" style="grid-column: 1 / -1;">
-                <div class="panel-header">📋 Message Log</div>
-                <div class="panel-body">
-                    <div class="messages" id="all-messages">
-                        <div class="empty">No messages yet</div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        const API_BASE = window.location.origin;
-        
-        // Show toast notification
-        function showToast(message, type = 'success') {
-            const toast = document.createElement('div');
-            toast.className = `toast ${type}`;
-            toast.textContent = message;
-            document.body.appendChild(toast);
-            setTimeout(() => toast.remove(), 3000);
-        }
-        
-        // Check health status
-        async function checkStatus() {
-            try {
-                const res = await fetch(`${API_BASE}/health`);
-                const data = await res.json();
-                
-                document.getElementById('status-dot').className = 
-                    data.status === 'healthy' ? 'status-dot' : 'status-dot error';
-                document.getElementById('status-text').textContent = 
-                    `Bridge: ${data.status}`;
-                document.getElementById('nightline-status').innerHTML = `
-                    <span class="status-dot ${data.nightline.connected ? '' : 'error'}"></span>
-                    <span>Nightline: ${data.nightline.connected ? 'Connected' : 'Disconnected'}</span>
-                `;
-            } catch (e) {
-                document.getElementById('status-dot').className = 'status-dot error';
-                document.getElementById('status-text').textContent = 'Bridge: Offline';
-            }
-        }
-        
-        // Load sent messages
-        async function loadSentMessages() {
-            try {
-                const res = await fetch(`${API_BASE}/test/sent`);
-                const data = await res.json();
-                
-                const container = document.getElementById('sent-messages');
-                if (data.messages.length === 0) {
-                    container.innerHTML = '<div class="empty">No messages sent yet</div>';
-                    return;
-                }
-                
-                container.innerHTML = data.messages.map(m => `
-                    <div class="message sent">
-                        <div class="message-header">
-                            <span>→ ${m.phone}</span>
-                            <span>${new Date(m.sent_at).toLocaleTimeString()}</span>
-                        </div>
-                        <div class="message-text">${escapeHtml(m.text)}</div>
-                    </div>
-                `).reverse().join('');
-            } catch (e) {
-                console.error('Failed to load sent messages:', e);
-            }
-        }
-        
-        // Load received/injected messages
-        async function loadReceivedMessages() {
-            try {
-                const res = await fetch(`${API_BASE}/test/received`);
-                const data = await res.json();
-                
-                const container = document.getElementById('all-messages');
-                if (data.messages.length === 0) {
-                    container.innerHTML = '<div class="empty">No messages yet</div>';
-                    return;
-                }
-                
-                container.innerHTML = data.messages.map(m => `
-                    <div class="message received">
-                        <div class="message-header">
-                            <span>← ${m.phone}</span>
-                            <span>${new Date(m.received_at).toLocaleTimeString()}</span>
-                        </div>
-                        <div class="message-text">${escapeHtml(m.text)}</div>
-                    </div>
-                `).reverse().join('');
-            } catch (e) {
-                console.error('Failed to load received messages:', e);
-            }
-        }
-        
-        // Escape HTML
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-        
-        // Handle form submission
-        document.getElementById('inject-form').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const phone = document.getElementById('phone').value;
-            const text = document.getElementById('text').value;
-            
-            try {
-                const res = await fetch(`${API_BASE}/test/inject`, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ phone, text, is_imessage: true })
-                });
-                
-                const data = await res.json();
-                
-                if (data.success) {
-                    showToast('Message injected! Check server logs for flow.');
-                    document.getElementById('text').value = '';
-                    loadReceivedMessages();
-                    // Also reload sent in case server responded
-                    setTimeout(loadSentMessages, 1000);
-                } else {
-                    showToast(data.error || 'Failed to inject message', 'error');
-                }
-            } catch (e) {
-                showToast('Failed to inject message', 'error');
-            }
-        });
-        
-        // Initial load
-        checkStatus();
-        loadSentMessages();
-        loadReceivedMessages();
-        
-        // Poll for updates
-        setInterval(() => {
-            loadSentMessages();
-            loadReceivedMessages();
-        }, 3000);
-        
-        setInterval(checkStatus, 10000);
-    </script>
-</body>
-</html>
-"""
-
-from fastapi.responses import HTMLResponse
-
-@app.get("/test", response_class=HTMLResponse)
-async def test_ui():
-    """
-    [MOCK MODE ONLY] Simple web UI for testing the bridge.
-    
-    Open http://localhost:8080/test in your browser.
-    """
-    if not settings.mock_mode:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Test UI is only available in mock mode. Set MOCK_MODE=true",
-        )
-    
-    return TEST_UI_HTML
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        # C event loop and HTTP parser (both ship with uvicorn[standard]).
+        # No reloader: its supervisor process costs throughput.
+        loop="uvloop",
+        http="httptools",
+        reload=False,
     )
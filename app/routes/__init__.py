@@ -0,0 +1 @@
+"""Optional bridge routes."""
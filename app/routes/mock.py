@@ -0,0 +1,636 @@
+"""
+Mock-mode test routes.
+
+Only registered when MOCK_MODE=true (see app.main), so production never
+dispatches to them. Lets you inject fake inbound messages, inspect what the
+mock sender "sent", and drive both from a small web UI at /test.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator
+
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from app.imessage import IncomingMessage, MockiMessageSender, MockiMessageWatcher
+from shared.static import StaticAsset
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["mock"])
+
+# Bound by app.main's lifespan once the mock components exist
+_watcher: MockiMessageWatcher
+_sender: MockiMessageSender
+
+
+# /test/stream: seconds between keepalive comments, and per-client backlog
+STREAM_KEEPALIVE = 15.0
+STREAM_QUEUE_SIZE = 256
+
+# One queue per open /test/stream connection
+_subscribers: set[asyncio.Queue[bytes]] = set()
+
+_CLEARED_FRAME = b"event: cleared\ndata: {}\n\n"
+
+
+def bind(watcher: MockiMessageWatcher, sender: MockiMessageSender) -> None:
+    """Attach the mock watcher and sender created at startup."""
+    global _watcher, _sender
+    _watcher = watcher
+    _sender = sender
+    watcher.on_inject = lambda message: _publish(_sse_frame(b"received", _received_dict(message)))
+    sender.on_send = lambda message: _publish(_sse_frame(b"sent", message))
+
+
+def _received_dict(message: IncomingMessage) -> dict:
+    """Shape an injected message the way the test UI expects it."""
+    return {
+        "id": message.guid,
+        "phone": message.phone,
+        "text": message.text,
+        "received_at": message.received_at.isoformat(),
+        "is_imessage": message.is_imessage,
+    }
+
+
+def _sse_frame(event: bytes, data: dict) -> bytes:
+    """Encode one server-sent event."""
+    return b"event: " + event + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def _publish(frame: bytes) -> None:
+    """Push an event to every connected /test/stream client."""
+    for queue in _subscribers:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Client isn't reading; it resyncs from the snapshot on reconnect
+            logger.debug("Dropping test stream event for a slow client")
+
+
+class InjectMessageRequest(BaseModel):
+    """Request to inject a test message."""
+    phone: str
+    text: str
+    is_imessage: bool = True
+
+
+class InjectMessageResponse(BaseModel):
+    """Response after injecting a test message."""
+    success: bool
+    message_id: str | None = None
+    error: str | None = None
+
+
+# The mock endpoints return ORJSONResponse directly, skipping response_model
+# validation and jsonable_encoder; the model only documents the schema.
+@router.post("/test/inject", responses={200: {"model": InjectMessageResponse}})
+async def inject_test_message(request: InjectMessageRequest) -> ORJSONResponse:
+    """
+    [MOCK MODE ONLY] Inject a test message as if received from a phone.
+    
+    This simulates receiving an iMessage/SMS so you can test the full flow
+    without a real iPhone connected.
+    """
+    try:
+        message = await _watcher.inject_message(
+            phone=request.phone,
+            text=request.text,
+            is_imessage=request.is_imessage,
+        )
+        return ORJSONResponse({"success": True, "message_id": message.guid, "error": None})
+    except Exception as e:
+        logger.error(f"Failed to inject message: {e}")
+        return ORJSONResponse({"success": False, "message_id": None, "error": str(e)})
+
+
+@router.get("/test/sent")
+async def get_sent_messages() -> ORJSONResponse:
+    """
+    [MOCK MODE ONLY] Get all messages that would have been sent via iMessage.
+    
+    Returns the list of messages that the mock sender has logged.
+    """
+    # get_sent_messages() returns a copy; take it once
+    messages = _sender.get_sent_messages()
+    return ORJSONResponse({
+        "messages": messages,
+        "count": len(messages),
+    })
+
+
+@router.get("/test/received")
+async def get_received_messages(after_id: str | None = None, limit: int = 200) -> ORJSONResponse:
+    """
+    [MOCK MODE ONLY] Get messages that have been injected/received.
+    
+    Returns up to `limit` of the newest injected messages, oldest first.
+    Pass the newest id you already have as `after_id` to only get new ones.
+    """
+    messages = _watcher.get_message_history(after_guid=after_id, limit=limit)
+    return ORJSONResponse({
+        "messages": [_received_dict(m) for m in messages],
+        "count": len(messages),
+    })
+
+
+async def _event_stream() -> AsyncIterator[bytes]:
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    _subscribers.add(queue)
+    try:
+        # Snapshot the history in the same step as subscribing so nothing is
+        # missed or sent twice, then replay it as one chunk
+        snapshot = [b"retry: 3000\n\n"]
+        snapshot += [_sse_frame(b"sent", m) for m in _sender.get_sent_messages()]
+        snapshot += [
+            _sse_frame(b"received", _received_dict(m))
+            for m in _watcher.get_message_history(limit=200)
+        ]
+        yield b"".join(snapshot)
+        
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        _subscribers.discard(queue)
+
+
+@router.get("/test/stream")
+async def stream_test_events() -> StreamingResponse:
+    """
+    [MOCK MODE ONLY] Server-sent events for the test UI.
+    
+    Replays the current sent/received history on connect, then pushes a
+    `sent`, `received` or `cleared` event as each one happens.
+    """
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.delete("/test/clear")
+async def clear_test_data() -> ORJSONResponse:
+    """
+    [MOCK MODE ONLY] Clear all test message data.
+    """
+    _sender.clear_sent_messages()
+    _publish(_CLEARED_FRAME)
+    
+    return ORJSONResponse({"success": True, "message": "Test data cleared"})
+
+
+# Test UI - simple HTML interface for manual testing
+TEST_UI_HTML = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>iPhone Bridge Test Console</title>
+    <style>
+        :root {
+            --bg: #0a0a0f;
+            --surface: #12121a;
+            --border: #2a2a3a;
+            --text: #e0e0e0;
+            --text-dim: #808090;
+            --accent: #00d4aa;
+            --accent-dim: #00a080;
+            --sent: #3b82f6;
+            --received: #10b981;
+            --error: #ef4444;
+        }
+        
+        * { box-sizing: border-box; margin: 0; padding: 0; }
+        
+        body {
+            font-family: 'SF Mono', 'Fira Code', 'Consolas', monospace;
+            background: var(--bg);
+            color: var(--text);
+            min-height: 100vh;
+            padding: 2rem;
+        }
+        
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+        }
+        
+        header {
+            display: flex;
+            align-items: center;
+            gap: 1rem;
+            margin-bottom: 2rem;
+            padding-bottom: 1rem;
+            border-bottom: 1px solid var(--border);
+        }
+        
+        header h1 {
+            font-size: 1.5rem;
+            font-weight: 600;
+            color: var(--accent);
+        }
+        
+        .badge {
+            background: var(--accent);
+            color: var(--bg);
+            padding: 0.25rem 0.75rem;
+            border-radius: 4px;
+            font-size: 0.75rem;
+            font-weight: 700;
+            text-transform: uppercase;
+        }
+        
+        .grid {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 2rem;
+        }
+        
+        @media (max-width: 900px) {
+            .grid { grid-template-columns: 1fr; }
+        }
+        
+        .panel {
+            background: var(--surface);
+            border: 1px solid var(--border);
+            border-radius: 8px;
+            overflow: hidden;
+        }
+        
+        .panel-header {
+            padding: 1rem;
+            border-bottom: 1px solid var(--border);
+            font-weight: 600;
+            font-size: 0.875rem;
+            text-transform: uppercase;
+            letter-spacing: 0.05em;
+            color: var(--text-dim);
+        }
+        
+        .panel-body {
+            padding: 1rem;
+        }
+        
+        .form-group {
+            margin-bottom: 1rem;
+        }
+        
+        label {
+            display: block;
+            font-size: 0.75rem;
+            color: var(--text-dim);
+            margin-bottom: 0.5rem;
+            text-transform: uppercase;
+            letter-spacing: 0.05em;
+        }
+        
+        input, textarea {
+            width: 100%;
+            padding: 0.75rem;
+            background: var(--bg);
+            border: 1px solid var(--border);
+            border-radius: 4px;
+            color: var(--text);
+            font-family: inherit;
+            font-size: 0.875rem;
+        }
+        
+        input:focus, textarea:focus {
+            outline: none;
+            border-color: var(--accent);
+        }
+        
+        textarea {
+            resize: vertical;
+            min-height: 100px;
+        }
+        
+        button {
+            background: var(--accent);
+            color: var(--bg);
+            border: none;
+            padding: 0.75rem 1.5rem;
+            border-radius: 4px;
+            font-family: inherit;
+            font-size: 0.875rem;
+            font-weight: 600;
+            cursor: pointer;
+            transition: background 0.2s;
+        }
+        
+        button:hover {
+            background: var(--accent-dim);
+        }
+        
+        button:disabled {
+            opacity: 0.5;
+            cursor: not-allowed;
+        }
+        
+        .messages {
+            max-height: 400px;
+            overflow-y: auto;
+        }
+        
+        .message {
+            padding: 0.75rem;
+            border-radius: 4px;
+            margin-bottom: 0.5rem;
+            font-size: 0.875rem;
+        }
+        
+        .message.sent {
+            background: rgba(59, 130, 246, 0.15);
+            border-left: 3px solid var(--sent);
+        }
+        
+        .message.received {
+            background: rgba(16, 185, 129, 0.15);
+            border-left: 3px solid var(--received);
+        }
+        
+        .message-header {
+            display: flex;
+            justify-content: space-between;
+            font-size: 0.75rem;
+            color: var(--text-dim);
+            margin-bottom: 0.5rem;
+        }
+        
+        .message-text {
+            word-break: break-word;
+        }
+        
+        .empty {
+            color: var(--text-dim);
+            font-style: italic;
+            text-align: center;
+            padding: 2rem;
+        }
+        
+        .status {
+            display: flex;
+            gap: 1rem;
+            padding: 1rem;
+            background: var(--surface);
+            border: 1px solid var(--border);
+            border-radius: 8px;
+            margin-bottom: 2rem;
+            font-size: 0.875rem;
+        }
+        
+        .status-item {
+            display: flex;
+            align-items: center;
+            gap: 0.5rem;
+        }
+        
+        .status-dot {
+            width: 8px;
+            height: 8px;
+            border-radius: 50%;
+            background: var(--received);
+        }
+        
+        .status-dot.error {
+            background: var(--error);
+        }
+        
+        .toast {
+            position: fixed;
+            bottom: 2rem;
+            right: 2rem;
+            padding: 1rem 1.5rem;
+            background: var(--surface);
+            border: 1px solid var(--border);
+            border-radius: 4px;
+            animation: slideIn 0.3s ease;
+        }
+        
+        .toast.success { border-color: var(--received); }
+        .toast.error { border-color: var(--error); }
+        
+        @keyframes slideIn {
+            from { transform: translateY(1rem); opacity: 0; }
+            to { transform: translateY(0); opacity: 1; }
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>📱 iPhone Bridge</h1>
+            <span class="badge">Mock Mode</span>
+        </header>
+        
+        <div class="status" id="status">
+            <div class="status-item">
+                <span class="status-dot" id="status-dot"></span>
+                <span id="status-text">Checking...</span>
+            </div>
+            <div class="status-item" id="nightline-status"></div>
+        </div>
+        
+        <div class="grid">
+            <div class="panel">
+                <div class="panel-header">📥 Inject Incoming Message</div>
+                <div class="panel-body">
+                    <form id="inject-form">
+                        <div class="form-group">
+                            <label for="phone">Phone Number</label>
+                            <input type="text" id="phone" placeholder="+15551234567" required>
+                        </div>
+                        <div class="form-group">
+                            <label for="text">Message Text</label>
+                            <textarea id="text" placeholder="Enter test message..."
+                                required></textarea>
+                        </div>
+                        <button type="submit">Send Test Message →</button>
+                    </form>
+                </div>
+            </div>
+            
+            <div class="panel">
+                <div class="panel-header">📤 Outgoing Messages (Mock)</div>
+                <div class="panel-body">
+                    <div class="messages" id="sent-messages">
+                        <div class="empty">No messages sent yet</div>
+                    </div>
+                </div>
+            </div>
+            
+            <div class="panel" style="grid-column: 1 / -1;">
+                <div class="panel-header">📋 Message Log</div>
+                <div class="panel-body">
+                    <div class="messages" id="all-messages">
+                        <div class="empty">No messages yet</div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <script>
+        const API_BASE = window.location.origin;
+        
+        // Show toast notification
+        function showToast(message, type = 'success') {
+            const toast = document.createElement('div');
+            toast.className = `toast ${type}`;
+            toast.textContent = message;
+            document.body.appendChild(toast);
+            setTimeout(() => toast.remove(), 3000);
+        }
+        
+        // Check health status
+        async function checkStatus() {
+            try {
+                const res = await fetch(`${API_BASE}/health`);
+                const data = await res.json();
+                
+                document.getElementById('status-dot').className =
+                    data.status === 'healthy' ? 'status-dot' : 'status-dot error';
+                document.getElementById('status-text').textContent =
+                    `Bridge: ${data.status}`;
+                document.getElementById('nightline-status').innerHTML = `
+                    <span class="status-dot ${data.nightline.connected ? '' : 'error'}"></span>
+                    <span>Nightline: ${
+                        data.nightline.connected ? 'Connected' : 'Disconnected'
+                    }</span>
+                `;
+            } catch (e) {
+                document.getElementById('status-dot').className = 'status-dot error';
+                document.getElementById('status-text').textContent = 'Bridge: Offline';
+            }
+        }
+        
+        // Live message lists: the stream replays the current history on
+        // connect, then pushes each message as it is sent/received. Ids
+        // already shown are skipped, and new nodes are added once per frame.
+        const sentContainer = document.getElementById('sent-messages');
+        const receivedContainer = document.getElementById('all-messages');
+        const SENT_EMPTY = '<div class="empty">No messages sent yet</div>';
+        const sentIds = new Set();
+        const receivedIds = new Set();
+        const pendingNodes = new Map();  // container -> nodes, oldest first
+        let flushScheduled = false;
+        
+        function messageNode(kind, arrow, phone, timestamp, text) {
+            const node = document.createElement('div');
+            node.className = `message ${kind}`;
+            node.innerHTML = `
+                <div class="message-header">
+                    <span>${arrow} ${escapeHtml(phone)}</span>
+                    <span>${new Date(timestamp).toLocaleTimeString()}</span>
+                </div>
+                <div class="message-text">${escapeHtml(text)}</div>
+            `;
+            return node;
+        }
+        
+        function flushMessages() {
+            flushScheduled = false;
+            for (const [container, nodes] of pendingNodes) {
+                const fragment = document.createDocumentFragment();
+                for (let i = nodes.length - 1; i >= 0; i--) {
+                    fragment.appendChild(nodes[i]);
+                }
+                const empty = container.querySelector('.empty');
+                if (empty) empty.remove();
+                container.prepend(fragment);
+            }
+            pendingNodes.clear();
+        }
+        
+        function queueMessage(container, seenIds, id, makeNode) {
+            if (seenIds.has(id)) return;
+            seenIds.add(id);
+            if (!pendingNodes.has(container)) pendingNodes.set(container, []);
+            pendingNodes.get(container).push(makeNode());
+            if (!flushScheduled) {
+                flushScheduled = true;
+                requestAnimationFrame(flushMessages);
+            }
+        }
+        
+        const events = new EventSource(`${API_BASE}/test/stream`);
+        events.addEventListener('sent', (e) => {
+            const m = JSON.parse(e.data);
+            queueMessage(sentContainer, sentIds, m.id,
+                () => messageNode('sent', '→', m.phone, m.sent_at, m.text));
+        });
+        events.addEventListener('received', (e) => {
+            const m = JSON.parse(e.data);
+            queueMessage(receivedContainer, receivedIds, m.id,
+                () => messageNode('received', '←', m.phone, m.received_at, m.text));
+        });
+        events.addEventListener('cleared', () => {
+            sentIds.clear();
+            pendingNodes.delete(sentContainer);
+            sentContainer.innerHTML = SENT_EMPTY;
+        });
+        
+        // Escape HTML
+        const HTML_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+        const HTML_ESCAPE_RE = /[&<>"']/g;
+        function escapeHtml(text) {
+            return String(text ?? '').replace(HTML_ESCAPE_RE, c => HTML_ESCAPES[c]);
+        }
+        
+        // Handle form submission
+        document.getElementById('inject-form').addEventListener('submit', async (e) => {
+            e.preventDefault();
+            
+            const phone = document.getElementById('phone').value;
+            const text = document.getElementById('text').value;
+            
+            try {
+                const res = await fetch(`${API_BASE}/test/inject`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ phone, text, is_imessage: true })
+                });
+                
+                const data = await res.json();
+                
+                if (data.success) {
+                    showToast('Message injected! Check server logs for flow.');
+                    document.getElementById('text').value = '';
+                } else {
+                    showToast(data.error || 'Failed to inject message', 'error');
+                }
+            } catch (e) {
+                showToast('Failed to inject message', 'error');
+            }
+        });
+        
+        // Initial load
+        checkStatus();
+        setInterval(checkStatus, 10000);
+    </script>
+</body>
+</html>
+"""
+
+# The page is static, so encode (and gzip) it once and let browsers
+# cache/revalidate it, negotiated the same way as the management dashboard
+_TEST_UI = StaticAsset(TEST_UI_HTML, cache_control="public, max-age=3600", minify=None)
+
+
+@router.get("/test", response_class=HTMLResponse)
+async def test_ui(request: Request):
+    """
+    [MOCK MODE ONLY] Simple web UI for testing the bridge.
+    
+    Open http://localhost:8080/test in your browser.
+    """
+    return _TEST_UI.response(request)
@@ -2,14 +2,24 @@
 Message Queue - Retry failed webhook deliveries.
 
 Stores messages that failed to deliver to Nightline and retries them
-with exponential backoff.
+with exponential backoff. Storage is pluggable: in memory, or a local
+SQLite file so pending retries survive a restart.
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
+import random
+import sqlite3
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable, Awaitable
+from pathlib import Path
+from typing import Awaitable, Callable, Protocol
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +31,22 @@ MAX_RETRIES = 10
 BASE_DELAY = 5  # seconds
 MAX_DELAY = 300  # 5 minutes max
 
+# Max deliveries in flight at once while draining a backlog
+DRAIN_CONCURRENCY = 16
+
+# During a backlog drain, yield to the event loop after starting this many
+# deliveries. An attempt doesn't always suspend (a delivery can fail before
+# it reaches the network, an uncontended semaphore doesn't yield), and each
+# one records its result in the backend, so without this a large drain could
+# hold the loop and delay /send and /ping.
+DELIVERIES_PER_YIELD = 32
+
 
-@dataclass
+@dataclass(slots=True)
 class QueuedMessage:
     """A message waiting to be delivered."""
     id: str
-    payload: dict
+    payload: bytes  # JSON, encoded once at enqueue
     created_at: float = field(default_factory=time.time)
     attempts: int = 0
     next_retry_at: float = 0
@@ -34,16 +54,167 @@ class QueuedMessage:
     def calculate_next_retry(self):
         """Exponential backoff with jitter."""
         delay = min(BASE_DELAY * (2 ** self.attempts), MAX_DELAY)
-        # Add some jitter (±20%)
-        import random
-        jitter = delay * 0.2 * (random.random() - 0.5)
+        # Add some jitter (20% spread around the delay)
+        jitter = delay * random.uniform(-0.1, 0.1)
         self.next_retry_at = time.time() + delay + jitter
         self.attempts += 1
 
 
+class QueueBackend(Protocol):
+    """Storage for queued messages, ordered by next_retry_at."""
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, message_id: object) -> bool: ...
+
+    def push(self, msg: QueuedMessage) -> None:
+        """Store a message, or reschedule it at its current next_retry_at."""
+        ...
+
+    def pop_due(self, now: float) -> list[QueuedMessage]:
+        """Return messages due at `now`. They stay stored until pushed again or removed."""
+        ...
+
+    def remove(self, message_id: str) -> None: ...
+
+    def next_due_at(self) -> float | None:
+        """Earliest next_retry_at, or None if nothing is queued."""
+        ...
+
+    def stats(self) -> tuple[int, float | None, dict[int, int]]:
+        """(message count, oldest created_at or None, count per attempts)."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class InMemoryBackend:
+    """Per-process dict plus a min-heap of retry times. Lost on restart."""
+
+    def __init__(self):
+        self._messages: dict[str, QueuedMessage] = {}
+        # Min-heap of (next_retry_at, seq, message_id). Entries go stale when a
+        # message is removed or rescheduled and are skipped when popped.
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._messages
+
+    def push(self, msg: QueuedMessage) -> None:
+        self._messages[msg.id] = msg
+        heapq.heappush(self._heap, (msg.next_retry_at, next(self._seq), msg.id))
+
+    def pop_due(self, now: float) -> list[QueuedMessage]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            retry_at, _, message_id = heapq.heappop(self._heap)
+            msg = self._messages.get(message_id)
+            if msg is None or msg.next_retry_at != retry_at:
+                continue  # Removed or rescheduled since this entry was pushed
+            due.append(msg)
+        return due
+
+    def remove(self, message_id: str) -> None:
+        self._messages.pop(message_id, None)
+
+    def next_due_at(self) -> float | None:
+        # A stale top entry only means one early, empty wakeup
+        return self._heap[0][0] if self._heap else None
+
+    def stats(self) -> tuple[int, float | None, dict[int, int]]:
+        by_attempts: Counter[int] = Counter()
+        oldest = None
+        # One pass over the queue for both the age and the attempt histogram
+        for m in self._messages.values():
+            by_attempts[m.attempts] += 1
+            if oldest is None or m.created_at < oldest:
+                oldest = m.created_at
+        return len(self._messages), oldest, dict(by_attempts)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend(InMemoryBackend):
+    """
+    Queue mirrored to a local SQLite file so pending retries survive a
+    restart (e.g. the auto-updater restarting the service during a
+    Nightline outage).
+
+    Reads are served from memory. Writes are committed in order on one
+    worker thread, so the event loop never waits on the disk.
+
+    Single-process only: two bridges sharing the file would both deliver.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS retry_queue (
+            id TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            attempts INTEGER NOT NULL,
+            next_retry_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS retry_queue_next ON retry_queue (next_retry_at);
+    """
+    _COLUMNS = "id, payload, created_at, attempts, next_retry_at"
+    _UPSERT = f"INSERT OR REPLACE INTO retry_queue ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+
+    def __init__(self, path: str | Path):
+        super().__init__()
+        self.path = Path(path)
+        # Used from the writer thread after setup; only one thread at a time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        for row in self._conn.execute(f"SELECT {self._COLUMNS} FROM retry_queue"):
+            super().push(self._from_row(row))
+        # One worker, so writes reach the file in the order they were made
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retry-queue")
+
+    @staticmethod
+    def _from_row(row: tuple) -> QueuedMessage:
+        message_id, payload, created_at, attempts, next_retry_at = row
+        return QueuedMessage(
+            id=message_id,
+            payload=payload,
+            created_at=created_at,
+            attempts=attempts,
+            next_retry_at=next_retry_at,
+        )
+
+    def _write(self, sql: str, params: tuple) -> None:
+        try:
+            with self._conn:
+                self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            # The in-memory queue is still right; only a restart would lose it
+            logger.error(f"Failed to persist retry queue change: {e}")
+
+    def push(self, msg: QueuedMessage) -> None:
+        super().push(msg)
+        # Fields are read now: msg is mutated again by later attempts
+        row = (msg.id, msg.payload, msg.created_at, msg.attempts, msg.next_retry_at)
+        self._writer.submit(self._write, self._UPSERT, row)
+
+    def remove(self, message_id: str) -> None:
+        super().remove(message_id)
+        self._writer.submit(self._write, "DELETE FROM retry_queue WHERE id = ?", (message_id,))
+
+    def close(self) -> None:
+        # Flush queued writes before closing the connection
+        self._writer.shutdown(wait=True)
+        self._conn.close()
+
+
 class MessageQueue:
     """
-    In-memory queue for failed message deliveries.
+    Retry queue for failed message deliveries.
     
     Usage:
         queue = MessageQueue(deliver_fn=nightline_client.forward_message)
@@ -51,84 +222,140 @@ class MessageQueue:
         
         # When a message fails to deliver:
         queue.enqueue(message_id, payload)
+    
+    Payloads are stored as JSON bytes (dicts are encoded once on enqueue);
+    `deliver_fn` receives the bytes, ready to post.
     """
 
     def __init__(
         self,
-        deliver_fn: Callable[[dict], Awaitable[bool]],
+        deliver_fn: Callable[[bytes], Awaitable[bool]],
         max_size: int = MAX_QUEUE_SIZE,
+        concurrency: int = DRAIN_CONCURRENCY,
+        backend: QueueBackend | None = None,
     ):
         self.deliver_fn = deliver_fn
         self.max_size = max_size
-        self._queue: dict[str, QueuedMessage] = {}
+        self._concurrency = concurrency
+        self._sem = asyncio.Semaphore(concurrency)
+        self._backend: QueueBackend = backend if backend is not None else InMemoryBackend()
         self._running = False
         self._task: asyncio.Task | None = None
+        # Set by enqueue() so the processor re-plans its sleep right away
+        self._wake = asyncio.Event()
 
     @property
     def size(self) -> int:
-        return len(self._queue)
+        return len(self._backend)
 
     @property
     def is_running(self) -> bool:
         return self._running
 
-    def enqueue(self, message_id: str, payload: dict) -> bool:
+    def enqueue(self, message_id: str, payload: dict | bytes) -> bool:
         """
         Add a message to the retry queue.
         
         Returns False if queue is full.
         """
-        if message_id in self._queue:
+        if message_id in self._backend:
             logger.debug(f"Message {message_id} already in queue")
             return True
 
-        if len(self._queue) >= self.max_size:
+        if len(self._backend) >= self.max_size:
             logger.error(f"Queue full ({self.max_size}), dropping message {message_id}")
             return False
 
+        # Encoded once here rather than on every retry
+        if not isinstance(payload, bytes):
+            payload = orjson.dumps(payload)
         msg = QueuedMessage(id=message_id, payload=payload)
         msg.calculate_next_retry()
-        self._queue[message_id] = msg
-        logger.info(f"Queued message {message_id} for retry (queue size: {len(self._queue)})")
+        self._backend.push(msg)
+        self._wake.set()
+        logger.info(f"Queued message {message_id} for retry (queue size: {len(self._backend)})")
         return True
 
     def remove(self, message_id: str):
         """Remove a message from the queue (after successful delivery)."""
-        self._queue.pop(message_id, None)
+        self._backend.remove(message_id)
+
+    def _pop_due(self, now: float) -> list[QueuedMessage]:
+        """Take every message due at `now`, dropping any out of retries."""
+        due = []
+        for msg in self._backend.pop_due(now):
+            if msg.attempts >= MAX_RETRIES:
+                logger.error(f"Message {msg.id} exceeded max retries, dropping")
+                self._backend.remove(msg.id)
+                continue
+            due.append(msg)
+        return due
+
+    def _record_result(self, msg: QueuedMessage, result: bool | BaseException):
+        """Apply the outcome of one delivery attempt to a queued message."""
+        if isinstance(result, BaseException):
+            msg.calculate_next_retry()
+            self._backend.push(msg)
+            logger.error(f"Error delivering message {msg.id}: {result}")
+        elif result:
+            logger.info(f"Message {msg.id} delivered successfully")
+            self._backend.remove(msg.id)
+        else:
+            msg.calculate_next_retry()
+            self._backend.push(msg)
+            logger.warning(
+                f"Message {msg.id} delivery failed, "
+                f"retry in {msg.next_retry_at - time.time():.0f}s"
+            )
+
+    async def _attempt(self, msg: QueuedMessage):
+        """Deliver one queued message while holding a concurrency slot."""
+        async with self._sem:
+            logger.info(f"Retrying message {msg.id} (attempt {msg.attempts + 1})")
+            try:
+                result = await self.deliver_fn(msg.payload)
+            except Exception as e:
+                result = e
+        self._record_result(msg, result)
+
+    async def _drain(self, attempts: list[Awaitable[None]]):
+        """Run delivery attempts concurrently, yielding every DELIVERIES_PER_YIELD starts."""
+        tasks = []
+        try:
+            for i, attempt in enumerate(attempts):
+                if i and i % DELIVERIES_PER_YIELD == 0:
+                    # Lets the tasks started so far run their first step, then
+                    # the loop polls I/O before the next group starts
+                    await asyncio.sleep(0)
+                tasks.append(asyncio.ensure_future(attempt))
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # stop(): wait for every started delivery to unwind, so none of
+            # them writes to the backend after it is closed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
     async def _process_queue(self):
         """Process queued messages."""
         while self._running:
-            now = time.time()
-            to_retry = [
-                msg for msg in self._queue.values()
-                if msg.next_retry_at <= now
-            ]
-
-            for msg in to_retry:
-                if msg.attempts >= MAX_RETRIES:
-                    logger.error(f"Message {msg.id} exceeded max retries, dropping")
-                    self._queue.pop(msg.id, None)
-                    continue
-
-                logger.info(f"Retrying message {msg.id} (attempt {msg.attempts + 1})")
-                
-                try:
-                    success = await self.deliver_fn(msg.payload)
-                    if success:
-                        logger.info(f"Message {msg.id} delivered successfully")
-                        self._queue.pop(msg.id, None)
-                    else:
-                        msg.calculate_next_retry()
-                        logger.warning(
-                            f"Message {msg.id} delivery failed, "
-                            f"retry in {msg.next_retry_at - time.time():.0f}s"
-                        )
-                except Exception as e:
-                    msg.calculate_next_retry()
-                    logger.error(f"Error delivering message {msg.id}: {e}")
-
-            await asyncio.sleep(1)
+            to_retry = self._pop_due(time.time())
+
+            # Overlap the round trips of everything that's due; the semaphore
+            # caps how many requests are in flight on the shared client
+            if to_retry:
+                await self._drain([self._attempt(msg) for msg in to_retry])
+
+            # Sleep until the earliest retry is due (indefinitely when empty),
+            # or until enqueue() adds something that may be due sooner
+            next_at = self._backend.next_due_at()
+            timeout = max(next_at - time.time(), 0) if next_at is not None else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
 
     async def start(self):
         """Start the queue processor."""
@@ -136,28 +363,33 @@ class MessageQueue:
             return
         self._running = True
         self._task = asyncio.create_task(self._process_queue())
-        logger.info("Message queue started")
+        pending = len(self._backend)
+        if pending:
+            logger.info(f"Message queue started ({pending} messages pending from last run)")
+        else:
+            logger.info("Message queue started")
 
-    def stop(self):
-        """Stop the queue processor."""
+    async def stop(self):
+        """Stop the queue processor, then close the backend."""
         self._running = False
         if self._task:
             self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
             self._task = None
-        logger.info(f"Message queue stopped ({len(self._queue)} messages pending)")
+        logger.info(f"Message queue stopped ({len(self._backend)} messages pending)")
+        self._backend.close()
 
     def get_stats(self) -> dict:
         """Get queue statistics for health endpoint."""
         now = time.time()
-        oldest = min((m.created_at for m in self._queue.values()), default=now)
-        
+        size, oldest, by_attempts = self._backend.stats()
+
         return {
-            "size": len(self._queue),
+            "size": size,
             "max_size": self.max_size,
-            "oldest_message_age_seconds": now - oldest if self._queue else 0,
-            "messages_by_attempts": {
-                i: sum(1 for m in self._queue.values() if m.attempts == i)
-                for i in range(MAX_RETRIES + 1)
-                if any(m.attempts == i for m in self._queue.values())
-            },
+            "oldest_message_age_seconds": now - oldest if oldest is not None else 0.0,
+            "messages_by_attempts": dict(sorted(by_attempts.items())),
         }
@@ -1,11 +1,16 @@
 """HTTP client for sending webhooks to Nightline server."""
 
+import asyncio
 import base64
 import logging
-from pathlib import Path
+import os
+import random
+import secrets
+import time
 from typing import TYPE_CHECKING
 
 import httpx
+from pydantic import BaseModel
 
 from app.config import settings
 from app.imessage.models import IncomingMessage
@@ -16,9 +21,60 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the h2 package (the httpx[http2] extra); an install that
+# only has plain httpx falls back to HTTP/1.1 instead of failing every POST
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Maximum file size to embed as base64 (5MB)
 MAX_INLINE_ATTACHMENT_SIZE = 5 * 1024 * 1024
 
+# Attachments are base64-encoded in chunks of this many bytes. A multiple
+# of 3, so each chunk encodes without padding and the pieces concatenate.
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# A successful request within this window counts as "connected"
+CONNECTED_WINDOW_SECONDS = 60
+
+# Inline retries for webhook POSTs, so a brief blip doesn't drop a status
+# update or send a message through the retry queue. Kept short because the
+# caller is waiting; longer outages are the retry queue's job.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+POST_MAX_ATTEMPTS = 3
+POST_RETRY_BASE = 0.5  # seconds
+POST_RETRY_CAP = 4.0  # seconds
+# No retry starts once its backoff would end past this much time since the
+# first attempt, so a request that already ran into the read timeout goes
+# straight to the caller (and on to the retry queue) instead of stalling it
+POST_RETRY_BUDGET = 10.0  # seconds
+
+# Circuit breaker: after this many consecutive failed calls, fail fast for
+# RESET_TIMEOUT seconds, then let a single call through as a probe
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0  # seconds
+
+# Fail fast when Nightline is unreachable or our connection pool is full;
+# read/write keep the caller's (longer) timeout for big attachment bodies
+CONNECT_TIMEOUT = 5.0  # seconds
+POOL_TIMEOUT = 5.0  # seconds
+
+# Attachments of one message encoded in parallel worker threads
+ENCODE_CONCURRENCY = 4
+
+
+def _to_json(model: BaseModel) -> bytes:
+    """
+    Serialize a webhook event straight to bytes.
+
+    model_dump_json() runs the same compiled serializer but decodes its
+    output to str, which we'd only encode back; with a few MB of inline
+    base64 that's two full copies of the body saved.
+    """
+    return model.__pydantic_serializer__.to_json(model)
+
 
 class NightlineClient:
     """
@@ -46,11 +102,53 @@ class NightlineClient:
         self.timeout = timeout
         self._client: httpx.AsyncClient | None = None
 
+        # time.monotonic() of the last request Nightline answered with 200
+        self.last_success_at: float | None = None
+
+        # Circuit breaker state: consecutive failures, and when it opened
+        self._failures = 0
+        self._opened_at: float | None = None
+
+        self._encode_sem = asyncio.Semaphore(ENCODE_CONCURRENCY)
+
+        # Cleared once Nightline answers a multipart upload with 415
+        self._multipart_accepted = True
+
+        # Webhook URLs never change, so build them once
+        # (None when NIGHTLINE_CLIENT_ID isn't configured)
+        client_id = settings.nightline_client_id
+        webhook_base = f"{self.base_url}/webhooks/iphone-bridge/{client_id}" if client_id else None
+        self.message_url: str | None = webhook_base and f"{webhook_base}/message"
+        self.status_url: str | None = webhook_base and f"{webhook_base}/status"
+        self.health_url: str | None = webhook_base and f"{webhook_base}/health"
+
+        # Checked by every webhook call; the misconfiguration is logged once here
+        self.enabled = bool(client_id)
+        if not self.enabled:
+            logger.error(
+                "NIGHTLINE_CLIENT_ID not configured - messages and status updates "
+                "will not be forwarded to Nightline"
+            )
+
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create the HTTP client."""
         if self._client is None or self._client.is_closed:
+            # One long-lived client: keep-alive avoids a TLS handshake per
+            # POST, and HTTP/2 (when h2 is installed) multiplexes queue
+            # drains over one connection
+            if not HTTP2_AVAILABLE:
+                logger.warning("h2 not installed, talking to Nightline over HTTP/1.1")
             self._client = httpx.AsyncClient(
-                timeout=self.timeout,
+                http2=HTTP2_AVAILABLE,
+                # Bounded pool sized for queue drains (DRAIN_CONCURRENCY) plus
+                # live traffic; a saturated pool fails in POOL_TIMEOUT rather
+                # than stalling the caller for the full request timeout
+                limits=httpx.Limits(
+                    max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0
+                ),
+                timeout=httpx.Timeout(
+                    self.timeout, connect=CONNECT_TIMEOUT, pool=POOL_TIMEOUT
+                ),
                 headers={
                     "Content-Type": "application/json",
                     "X-Bridge-Secret": self.secret,
@@ -59,12 +157,119 @@ class NightlineClient:
             )
         return self._client
 
+    async def _post_with_retry(
+        self,
+        url: str,
+        content: bytes,
+        *,
+        max_attempts: int = POST_MAX_ATTEMPTS,
+        base: float = POST_RETRY_BASE,
+        cap: float = POST_RETRY_CAP,
+        budget: float = POST_RETRY_BUDGET,
+    ) -> httpx.Response:
+        """
+        POST an encoded JSON body, retrying transport errors and 429/5xx
+        responses with exponential backoff plus jitter, within `budget`
+        seconds of the first attempt.
+
+        Returns the last response (any other status is returned at once).
+        Re-raises the transport error if the final attempt still fails.
+        """
+        client = await self._get_client()
+        deadline = time.monotonic() + budget
+        for attempt in range(max_attempts):
+            error = None
+            try:
+                # Content-Type: application/json is a client default header
+                response = await client.post(url, content=content)
+            except httpx.TransportError as e:
+                error = e
+                failure = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                failure = f"HTTP {response.status_code}"
+
+            delay = min(base * 2 ** attempt, cap) + random.uniform(0, 0.5)
+            if attempt == max_attempts - 1 or time.monotonic() + delay > deadline:
+                self.mark_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            logger.warning(
+                f"POST {url} failed ({failure}) on attempt {attempt + 1}/{max_attempts}, "
+                f"retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def mark_success(self) -> None:
+        """Record that Nightline just answered a request successfully."""
+        self.last_success_at = time.monotonic()
+        self._failures = 0
+        if self._opened_at is not None:
+            logger.info("Nightline reachable again, closing circuit breaker")
+            self._opened_at = None
+
+    def mark_failure(self) -> None:
+        """Record a call that failed because Nightline was down or erroring."""
+        self._failures += 1
+        if self._failures >= FAILURE_THRESHOLD:
+            if self._opened_at is None:
+                logger.warning(
+                    f"Nightline failed {self._failures} times in a row, "
+                    f"failing fast for {RESET_TIMEOUT:.0f}s"
+                )
+            self._opened_at = time.monotonic()
+
+    def allow_request(self) -> bool:
+        """
+        Circuit breaker check: False while open and cooling down.
+
+        Once the cooldown has passed, the next caller is let through as the
+        half-open probe and the cooldown restarts, so concurrent callers keep
+        failing fast until the probe succeeds (closing the circuit).
+        """
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < RESET_TIMEOUT:
+            return False
+        self._opened_at = now
+        return True
+
+    @property
+    def is_connected(self) -> bool:
+        """True if Nightline answered successfully within CONNECTED_WINDOW_SECONDS."""
+        return (
+            self.last_success_at is not None
+            and time.monotonic() - self.last_success_at < CONNECTED_WINDOW_SECONDS
+        )
+
     async def close(self):
         """Close the HTTP client."""
         if self._client and not self._client.is_closed:
             await self._client.aclose()
             self._client = None
 
+    @staticmethod
+    def _read_base64(path: str, file_size: int) -> str:
+        """Base64-encode a file chunk by chunk into a buffer sized up front."""
+        out = bytearray((file_size + 2) // 3 * 4)
+        pos = 0
+        # Buffered reads: read(n) keeps going until it has n bytes or hits
+        # EOF, whereas a short raw read that isn't a multiple of 3 would put
+        # "=" padding in the middle of the output
+        with open(path, "rb") as f:
+            while chunk := f.read(BASE64_CHUNK_SIZE):
+                encoded = base64.b64encode(chunk)
+                out[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+        # The file may have changed size since it was stat'd
+        if pos != len(out):
+            del out[pos:]
+        return out.decode("ascii")
+
     def _encode_attachment(self, attachment) -> AttachmentInfo | None:
         """
         Encode an attachment for sending to Nightline.
@@ -76,18 +281,16 @@ class NightlineClient:
             AttachmentInfo if successful, None if attachment can't be read
         """
         try:
-            path = Path(attachment.path)
-            if not path.exists():
+            # One stat(2) both checks the file is there and sizes it
+            try:
+                file_size = os.stat(attachment.path).st_size
+            except OSError:
                 logger.warning(f"Attachment file not found: {attachment.path}")
                 return None
             
-            file_size = path.stat().st_size
-            
             # Only encode small files inline
             if file_size <= MAX_INLINE_ATTACHMENT_SIZE:
-                with open(path, "rb") as f:
-                    data = f.read()
-                data_base64 = base64.b64encode(data).decode("utf-8")
+                data_base64 = self._read_base64(attachment.path, file_size)
                 
                 return AttachmentInfo(
                     filename=attachment.filename,
@@ -98,7 +301,10 @@ class NightlineClient:
             else:
                 # For large files, just send metadata
                 # The server can request the file separately if needed
-                logger.info(f"Attachment too large for inline encoding: {attachment.filename} ({file_size} bytes)")
+                logger.info(
+                    f"Attachment too large for inline encoding: {attachment.filename} "
+                    f"({file_size} bytes)"
+                )
                 return AttachmentInfo(
                     filename=attachment.filename,
                     mime_type=attachment.mime_type,
@@ -111,46 +317,85 @@ class NightlineClient:
             logger.error(f"Failed to encode attachment {attachment.filename}: {e}")
             return None
 
-    async def forward_message(self, message: IncomingMessage) -> bool:
+    def build_payload(self, message: IncomingMessage) -> bytes:
         """
-        Forward an incoming message to the Nightline server.
+        Build the JSON body for a message.received webhook.
+
+        Built once per message: the same bytes are posted by forward_payload
+        and, if that fails, handed to the retry queue as-is.
+
+        Reads and encodes attachment files, so for messages with attachments
+        use build_payload_async to keep that off the event loop.
 
         Args:
             message: The incoming message to forward
 
         Returns:
-            True if successfully delivered, False otherwise
+            MessageReceivedEvent encoded as JSON
         """
-        # Encode any attachments
-        attachment_infos = []
-        for attachment in message.attachments:
-            info = self._encode_attachment(attachment)
-            if info:
-                attachment_infos.append(info)
-        
+        return self._encode_event(
+            message, [self._encode_attachment(a) for a in message.attachments]
+        )
+
+    def _encode_event(
+        self, message: IncomingMessage, attachment_infos: list[AttachmentInfo | None]
+    ) -> bytes:
+        """Serialize a message.received event, dropping attachments that failed to encode."""
         event = MessageReceivedEvent(
             phone=message.phone,
             text=message.text,
             received_at=message.received_at,
             message_id=message.guid,
             is_imessage=message.is_imessage,
-            attachments=attachment_infos,
+            attachments=[info for info in attachment_infos if info],
         )
+        return _to_json(event)
 
-        # Include client_id in the URL path
-        client_id = settings.nightline_client_id
-        if not client_id:
-            logger.error("NIGHTLINE_CLIENT_ID not configured - cannot forward message")
+    async def build_payload_async(self, message: IncomingMessage) -> bytes:
+        """
+        build_payload without blocking the event loop.
+
+        Each attachment is read and encoded in its own worker thread (base64
+        releases the GIL, and the disk reads overlap), at most
+        ENCODE_CONCURRENCY at a time.
+        """
+        if not message.attachments:
+            return self.build_payload(message)
+
+        async def encode(attachment) -> AttachmentInfo | None:
+            async with self._encode_sem:
+                return await asyncio.to_thread(self._encode_attachment, attachment)
+
+        infos = await asyncio.gather(*(encode(a) for a in message.attachments))
+        return self._encode_event(message, infos)
+
+    async def forward_payload(self, message: IncomingMessage, payload: bytes) -> bool:
+        """
+        Post a pre-built message payload to the Nightline server.
+
+        Args:
+            message: The message the payload was built from (for logging)
+            payload: Payload from build_payload
+
+        Returns:
+            True if successfully delivered, False otherwise
+        """
+        if not self.enabled:
+            return False
+        url = self.message_url
+
+        if not self.allow_request():
+            logger.warning(f"Nightline circuit open, not forwarding message (id={message.guid})")
             return False
-        
-        url = f"{self.base_url}/webhooks/iphone-bridge/{client_id}/message"
 
         try:
-            client = await self._get_client()
-            response = await client.post(url, json=event.model_dump(mode="json"))
+            response = await self._post_with_retry(url, payload)
 
             if response.status_code == 200:
-                attach_str = f" with {len(attachment_infos)} attachments" if attachment_infos else ""
+                self.mark_success()
+                attach_str = (
+                    f" with {len(message.attachments)} attachments" if message.attachments else ""
+                )
                 logger.info(
                     f"Forwarded message from {message.phone} to Nightline{attach_str} "
                     f"(id={message.guid})"
@@ -169,10 +414,159 @@ class NightlineClient:
         except httpx.ConnectError as e:
             logger.error(f"Connection error forwarding message: {e}")
             return False
+        except httpx.TransportError as e:
+            logger.error(f"Transport error forwarding message: {e}")
+            return False
         except Exception as e:
             logger.error(f"Unexpected error forwarding message: {e}")
             return False
 
+    async def deliver_payload(self, payload: bytes) -> bool:
+        """
+        Post a queued message payload once, for the retry queue.
+
+        No inline retries: the queue schedules its own backoff.
+
+        Returns:
+            True if successfully delivered, False otherwise
+        """
+        if not self.enabled:
+            return False
+        url = self.message_url
+
+        # Circuit open: fail fast and let the queue back off
+        if not self.allow_request():
+            return False
+
+        try:
+            response = await self._post_with_retry(url, payload, max_attempts=1)
+        except httpx.TransportError as e:
+            # Already counted against the circuit by _post_with_retry
+            logger.error(f"Delivery failed: {e}")
+            return False
+        except Exception as e:
+            self.mark_failure()
+            logger.error(f"Delivery failed: {e}")
+            return False
+
+        if response.status_code == 200:
+            self.mark_success()
+            return True
+        return False
+
+    @staticmethod
+    def _read_upload(path: str) -> tuple[bool, bytes | None]:
+        """
+        Read an attachment for a multipart upload.
+
+        Returns (found, data): data is None for a file over the inline size
+        cap, which is sent as metadata only.
+        """
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size > MAX_INLINE_ATTACHMENT_SIZE:
+                    return True, None
+                return True, f.read()
+        except OSError:
+            return False, None
+
+    async def forward_multipart(self, message: IncomingMessage) -> bool | None:
+        """
+        Post a message and its attachment files as multipart/form-data.
+
+        The event JSON goes in the "event" field with attachment metadata
+        only (no data_base64), and each file under the inline size cap is
+        sent as an "attachment" part, so files aren't base64-inflated.
+
+        Args:
+            message: The incoming message to forward
+
+        Returns:
+            True if delivered, False if delivery failed, None if Nightline
+            doesn't accept multipart and the JSON payload should be sent instead
+        """
+        if not self._multipart_accepted:
+            return None
+
+        if not self.enabled:
+            return False
+        url = self.message_url
+
+        if not self.allow_request():
+            logger.warning(f"Nightline circuit open, not forwarding message (id={message.guid})")
+            return False
+
+        # Files are read in worker threads (like build_payload_async), at
+        # most ENCODE_CONCURRENCY at a time, so uploads never block the loop
+        async def read(attachment) -> tuple[bool, bytes | None]:
+            async with self._encode_sem:
+                return await asyncio.to_thread(self._read_upload, attachment.path)
+
+        reads = await asyncio.gather(*(read(a) for a in message.attachments))
+
+        attachment_infos = []
+        files = []
+        for attachment, (found, data) in zip(message.attachments, reads):
+            if not found:
+                logger.warning(f"Attachment file not found: {attachment.path}")
+                continue
+            attachment_infos.append(AttachmentInfo(
+                filename=attachment.filename,
+                mime_type=attachment.mime_type,
+                size_bytes=attachment.size_bytes,
+            ))
+            if data is not None:
+                files.append(("attachment", (attachment.filename, data, attachment.mime_type)))
+
+        payload = self._encode_event(message, attachment_infos)
+        try:
+            client = await self._get_client()
+            # Spelled out so it overrides the client's JSON default
+            boundary = secrets.token_hex(16)
+            response = await client.post(
+                url,
+                data={"event": payload},
+                files=files,
+                headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            )
+        except Exception as e:
+            self.mark_failure()
+            logger.error(f"Error forwarding multipart message: {e}")
+            return False
+
+        if response.status_code == 415:
+            logger.warning("Nightline does not accept multipart uploads, using inline base64")
+            self._multipart_accepted = False
+            return None
+
+        if response.status_code == 200:
+            self.mark_success()
+            logger.info(
+                f"Forwarded message from {message.phone} to Nightline with "
+                f"{len(files)} uploaded attachments (id={message.guid})"
+            )
+            return True
+
+        if response.status_code in RETRY_STATUS_CODES:
+            self.mark_failure()
+        logger.error(
+            f"Failed to forward multipart message: HTTP {response.status_code} - "
+            f"{response.text}"
+        )
+        return False
+
+    async def forward_message(self, message: IncomingMessage) -> bool:
+        """
+        Forward an incoming message to the Nightline server.
+
+        Args:
+            message: The incoming message to forward
+
+        Returns:
+            True if successfully delivered, False otherwise
+        """
+        return await self.forward_payload(message, await self.build_payload_async(message))
+
     async def health_check(self) -> bool:
         """
         Check if the Nightline server is reachable.
@@ -180,13 +574,24 @@ class NightlineClient:
         Returns:
             True if server responds, False otherwise
         """
-        url = f"{self.base_url}/webhooks/iphone-bridge/{settings.nightline_client_id}/health"
+        if not self.enabled:
+            return False
+        url = self.health_url
+
+        if not self.allow_request():
+            return False
 
         try:
             client = await self._get_client()
             response = await client.get(url)
-            return response.status_code == 200
+            if response.status_code == 200:
+                self.mark_success()
+                return True
+            if response.status_code in RETRY_STATUS_CODES:
+                self.mark_failure()
+            return False
         except Exception as e:
+            self.mark_failure()
             logger.warning(f"Nightline server health check failed: {e}")
             return False
     
@@ -202,6 +607,14 @@ class NightlineClient:
         Returns:
             True if successfully delivered, False otherwise
         """
+        if not self.enabled:
+            return False
+        url = self.status_url
+        
+        if not self.allow_request():
+            logger.warning(f"Nightline circuit open, dropping {update.status} status update")
+            return False
+        
         event = MessageStatusEvent(
             event=f"message.{update.status}",  # "message.delivered" or "message.read"
             phone=update.phone,
@@ -210,18 +623,11 @@ class NightlineClient:
             is_imessage=update.is_imessage,
         )
         
-        client_id = settings.nightline_client_id
-        if not client_id:
-            logger.error("NIGHTLINE_CLIENT_ID not configured - cannot send status update")
-            return False
-        
-        url = f"{self.base_url}/webhooks/iphone-bridge/{client_id}/status"
-        
         try:
-            client = await self._get_client()
-            response = await client.post(url, json=event.model_dump(mode="json"))
+            response = await self._post_with_retry(url, _to_json(event))
             
             if response.status_code == 200:
+                self.mark_success()
                 logger.info(
                     f"Sent {update.status} status for message to {update.phone} "
                     f"(id={update.guid[:8]}...)"
@@ -240,6 +646,9 @@ class NightlineClient:
         except httpx.ConnectError as e:
             logger.error(f"Connection error sending status update: {e}")
             return False
+        except httpx.TransportError as e:
+            logger.error(f"Transport error sending status update: {e}")
+            return False
         except Exception as e:
             logger.error(f"Unexpected error sending status update: {e}")
-            return False
\ No newline at end of file
+            return False
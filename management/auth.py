@@ -1,20 +1,86 @@
 """Authentication for Management Agent."""
 
-import hashlib
 import hmac
 import secrets
+import time
+from collections import deque
 from typing import Optional
 
-from fastapi import Cookie, Header, HTTPException, status
+from fastapi import Cookie, Header, HTTPException, Request, status
 
 from management.config import settings
 
+# Sent with every 401; never mutated, so one dict serves all requests
+_AUTH_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+# Failed logins allowed per client within the window before /login stops
+# checking tokens for it
+LOGIN_FAILURE_LIMIT = 5
+LOGIN_FAILURE_WINDOW = 60.0
+# Clients tracked at once; the oldest entries are dropped past this
+LOGIN_FAILURE_CLIENTS = 1024
+
+_login_failures: dict[str, deque[float]] = {}
+
+# cloudflared connects from here, so these peers may name the real client
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1"})
+
+
+def _extract_token(authorization: Optional[str], mgmt_session: Optional[str]) -> Optional[str]:
+    """Pull the token from the Authorization header, falling back to the cookie."""
+    token = None
+    if authorization:
+        token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+    return token or mgmt_session or None
+
 
 def verify_token(token: str) -> bool:
     """Securely compare token against configured management token."""
     if not settings.management_token:
         return False
-    return hmac.compare_digest(token, settings.management_token)
+    # Compared as bytes: compare_digest rejects str with non-ASCII
+    # characters, which a cookie or header can carry
+    return hmac.compare_digest(token.encode("utf-8"), settings.management_token.encode("utf-8"))
+
+
+def login_client(request: Request) -> str:
+    """
+    The address a login attempt is rate-limited by.
+
+    Behind the Cloudflare tunnel every request arrives from loopback, so
+    keying on the peer would let one client lock everyone out. For loopback
+    peers the address Cloudflare puts in CF-Connecting-IP is used instead;
+    from any other peer the header could be forged and is ignored.
+    """
+    peer = request.client.host if request.client else ""
+    if peer in _LOOPBACK_HOSTS:
+        return request.headers.get("cf-connecting-ip", "").strip() or peer
+    return peer
+
+
+def login_allowed(client: str) -> bool:
+    """Whether a client may attempt a login (not over the failure limit)."""
+    failures = _login_failures.get(client)
+    if failures is None:
+        return True
+    cutoff = time.monotonic() - LOGIN_FAILURE_WINDOW
+    while failures and failures[0] < cutoff:
+        failures.popleft()
+    if not failures:
+        del _login_failures[client]
+        return True
+    return len(failures) < LOGIN_FAILURE_LIMIT
+
+
+def record_login_failure(client: str) -> None:
+    """Count a failed login against a client."""
+    failures = _login_failures.get(client)
+    if failures is None:
+        if len(_login_failures) >= LOGIN_FAILURE_CLIENTS:
+            # Dicts keep insertion order: evict the longest-tracked client
+            del _login_failures[next(iter(_login_failures))]
+        failures = _login_failures[client] = deque(maxlen=LOGIN_FAILURE_LIMIT)
+    failures.append(time.monotonic())
 
 
 async def require_auth(
@@ -30,31 +96,19 @@ async def require_auth(
     
     Returns the validated token.
     """
-    token = None
-
-    # Check header first
-    if authorization:
-        if authorization.startswith("Bearer "):
-            token = authorization[7:]
-        else:
-            token = authorization
-
-    # Fall back to cookie
-    if not token and mgmt_session:
-        token = mgmt_session
-
+    token = _extract_token(authorization, mgmt_session)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
-            headers={"WWW-Authenticate": "Bearer"},
+            headers=_AUTH_HEADERS,
         )
 
     if not verify_token(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
+            headers=_AUTH_HEADERS,
         )
 
     return token
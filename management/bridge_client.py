@@ -0,0 +1,32 @@
+"""Shared HTTP client for calls from the management agent to the bridge."""
+
+import httpx
+
+BRIDGE_URL = "http://localhost:8080"
+
+_shared_client: httpx.AsyncClient | None = None
+
+
+def get_bridge_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide client for bridge requests, creating it on first use.
+
+    Reusing it keeps connections to the bridge alive across dashboard
+    requests instead of opening a new one per call.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = httpx.AsyncClient(
+            base_url=BRIDGE_URL,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+        )
+    return _shared_client
+
+
+async def close_bridge_client() -> None:
+    """Close the shared client (on shutdown)."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
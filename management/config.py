@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     # Server
     host: str = "0.0.0.0"
     port: int = 8081
+    # Auto-reload on code changes when run via `python -m management.main`
+    # (development only: the reloader adds a supervisor process and file watching)
+    mgmt_reload: bool = False
 
     # Paths
     install_dir: Path = Path.home() / "iphone-bridge"
@@ -5,15 +5,36 @@ Run with:
     uvicorn management.main:app --host 0.0.0.0 --port 8081
 """
 
+import html
 import logging
+import re
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl
 
-from fastapi import FastAPI, Request, Response, Form, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Response, Depends
+from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from management.config import settings
-from management.auth import verify_token, require_auth
+from management.auth import (
+    login_allowed,
+    login_client,
+    record_login_failure,
+    require_auth,
+    verify_token,
+)
+from management.bridge_client import close_bridge_client
 from management.routes import services, config, logs, health, update, control
+from shared.static import (
+    IMMUTABLE_CACHE,
+    NegotiatedGZipMiddleware,
+    StaticAsset,
+    minify_css,
+    minify_html,
+    minify_js,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -22,20 +43,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the shared bridge client on shutdown."""
+    yield
+    await close_bridge_client()
+
+
 app = FastAPI(
     title="iPhone Bridge Management",
     description="Admin interface for iPhone Bridge",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# The dashboard calls the API from its own origin, which needs no CORS at
+# all; only the tunnel hostname and local access are allowed cross-origin,
+# and preflights are cached for a day
+_CORS_ORIGINS = [f"http://localhost:{settings.port}", f"http://127.0.0.1:{settings.port}"]
+if settings.management_url:
+    _CORS_ORIGINS.append(settings.management_url)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PATCH"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
+# The dashboard HTML and larger JSON (config, logs) compress well
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=500)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(services.router)
@@ -179,49 +219,113 @@ def get_display_name() -> str:
     return "iPhone Bridge"
 
 
+# The login template minified and split once at import into UTF-8 encoded
+# literal text (even indices) and placeholder names (odd indices), so
+# rendering is a single join of ready-made bytes rather than a scan and
+# re-encode of the whole page per request
+_LOGIN_PARTS = [
+    part if i % 2 else part.encode("utf-8")
+    for i, part in enumerate(re.split(r"\{\{(\w+)\}\}", minify_html(LOGIN_HTML)))
+]
+
+
+@lru_cache(maxsize=64)
+def _error_fragment(error: str) -> bytes:
+    """The login error banner; the message comes from the query string, so escape it."""
+    if not error:
+        return b""
+    return f'<div class="error">{html.escape(error)}</div>'.encode("utf-8")
+
+
+@lru_cache(maxsize=32)
+def _render_login(display_name: str, error: str) -> bytes:
+    """Fill in the login template (cached: in practice only a few variants exist)."""
+    values = {
+        "ERROR": _error_fragment(error),
+        "DISPLAY_NAME": html.escape(display_name).encode("utf-8"),
+    }
+    parts = _LOGIN_PARTS.copy()
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    return b"".join(parts)
+
+
+@lru_cache(maxsize=4)
+def _login_asset(display_name: str) -> StaticAsset:
+    """The error-free login page, gzipped and tagged once so repeat visits can 304."""
+    return StaticAsset(_render_login(display_name, "").decode("utf-8"), minify=None)
+
+
+_LOGIN_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Login flow redirects all have fixed targets, so build the headers once
+# rather than a RedirectResponse (with URL quoting) per hit
+_LOGIN_REDIRECT_HEADERS = {"location": "/login"}
+_INVALID_TOKEN_REDIRECT_HEADERS = {"location": "/login?error=Invalid+token"}
+_RATE_LIMITED_REDIRECT_HEADERS = {"location": "/login?error=Too+many+attempts%2C+try+again+later"}
+_DASHBOARD_REDIRECT_HEADERS = {"location": "/"}
+
+# Session cookie attributes never change while the process runs; only the
+# value does, so the Set-Cookie line is formatted once per token rather than
+# through Response.set_cookie on every login. Secure requires HTTPS.
+_SESSION_COOKIE_ATTRS = (
+    f"; HttpOnly; Max-Age={settings.cookie_max_age}; Path=/; SameSite=strict; Secure"
+)
+_CLEAR_SESSION_COOKIE = f'{settings.cookie_name}=""; Max-Age=0; Path=/; SameSite=lax'.encode(
+    "latin-1"
+)
+
+
+@lru_cache(maxsize=4)
+def _session_cookie(token: str) -> bytes:
+    """The Set-Cookie value for a session, quoted the way set_cookie would."""
+    _, value = SimpleCookie().value_encode(token)
+    return f"{settings.cookie_name}={value}{_SESSION_COOKIE_ATTRS}".encode("latin-1")
+
+
+# Far above any real token; bigger bodies are rejected without being read in full
+MAX_LOGIN_BODY = 1024
+
+
 @app.get("/login", response_class=HTMLResponse)
-async def login_page(error: str = ""):
+async def login_page(request: Request, error: str = ""):
     """Show login page."""
-    error_html = ""
-    if error:
-        error_html = f'<div class="error">{error}</div>'
-    
     display_name = get_display_name()
-    
-    return (
-        LOGIN_HTML
-        .replace("{{ERROR}}", error_html)
-        .replace("{{DISPLAY_NAME}}", display_name)
-    )
+    if not error:
+        return _login_asset(display_name).response(request)
+    return Response(_render_login(display_name, error), media_type=_LOGIN_MEDIA_TYPE)
 
 
 @app.post("/login")
-async def login(response: Response, token: str = Form(...)):
+async def login(request: Request):
     """Handle login form submission."""
-    if not verify_token(token):
-        return RedirectResponse(
-            url="/login?error=Invalid+token",
-            status_code=303,
-        )
+    client = login_client(request)
+    if not login_allowed(client):
+        return Response(status_code=303, headers=_RATE_LIMITED_REDIRECT_HEADERS)
+
+    # The form is a single short urlencoded field: parse it directly rather
+    # than through Starlette's general form parser
+    body = b""
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_LOGIN_BODY:
+            break
+    token = ""
+    if len(body) <= MAX_LOGIN_BODY:
+        token = dict(parse_qsl(body.decode("utf-8", "replace"))).get("token", "")
+    if not token or not verify_token(token):
+        record_login_failure(client)
+        return Response(status_code=303, headers=_INVALID_TOKEN_REDIRECT_HEADERS)
     
-    # Set session cookie
-    response = RedirectResponse(url="/", status_code=303)
-    response.set_cookie(
-        key=settings.cookie_name,
-        value=token,
-        httponly=True,
-        secure=True,  # Requires HTTPS
-        samesite="strict",
-        max_age=settings.cookie_max_age,
-    )
+    response = Response(status_code=303, headers=_DASHBOARD_REDIRECT_HEADERS)
+    response.raw_headers.append((b"set-cookie", _session_cookie(token)))
     return response
 
 
 @app.get("/logout")
 async def logout():
     """Clear session and redirect to login."""
-    response = RedirectResponse(url="/login", status_code=303)
-    response.delete_cookie(settings.cookie_name)
+    response = Response(status_code=303, headers=_LOGIN_REDIRECT_HEADERS)
+    response.raw_headers.append((b"set-cookie", _CLEAR_SESSION_COOKIE))
     return response
 
 
@@ -229,6 +333,1287 @@ async def logout():
 # Dashboard UI
 # ============================================================
 
+DASHBOARD_CSS = """
+:root {
+    --bg: #09090b;
+    --surface: #18181b;
+    --surface-2: #27272a;
+    --border: #3f3f46;
+    --text: #fafafa;
+    --text-secondary: #a1a1aa;
+    --text-muted: #71717a;
+    --accent: #3b82f6;
+    --accent-hover: #2563eb;
+    --green: #22c55e;
+    --red: #ef4444;
+    --yellow: #eab308;
+}
+
+* { box-sizing: border-box; margin: 0; padding: 0; }
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    background: var(--bg);
+    color: var(--text);
+    line-height: 1.5;
+    min-height: 100vh;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    padding: 2rem;
+}
+
+header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 2rem;
+    padding-bottom: 1.5rem;
+    border-bottom: 1px solid var(--border);
+}
+
+.header-left {
+    display: flex;
+    flex-direction: column;
+    gap: 0.375rem;
+}
+
+header h1 {
+    font-size: 1.5rem;
+    font-weight: 600;
+}
+
+.identifier-badge {
+    display: inline-flex;
+    align-items: center;
+    gap: 0.375rem;
+    padding: 0.25rem 0.5rem;
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 4px;
+    font-family: 'SF Mono', monospace;
+    font-size: 0.75rem;
+    color: var(--text-muted);
+    cursor: pointer;
+    width: fit-content;
+}
+
+.identifier-badge:hover {
+    color: var(--text-secondary);
+    border-color: var(--text-muted);
+}
+
+.identifier-badge .copy-icon {
+    opacity: 0.5;
+    flex-shrink: 0;
+}
+
+.identifier-badge:hover .copy-icon {
+    opacity: 1;
+}
+
+.identifier-badge svg {
+    display: block;
+}
+
+.header-right {
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+}
+
+.status-badge {
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+    padding: 0.375rem 0.75rem;
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 9999px;
+    font-size: 0.8125rem;
+}
+
+.status-dot {
+    width: 8px;
+    height: 8px;
+    border-radius: 50%;
+    background: var(--green);
+}
+
+.status-dot.offline { background: var(--red); }
+.status-dot.degraded { background: var(--yellow); }
+
+.logout-btn {
+    color: var(--text-muted);
+    text-decoration: none;
+    font-size: 0.8125rem;
+}
+
+.logout-btn:hover { color: var(--text); }
+
+.grid {
+    display: grid;
+    grid-template-columns: repeat(2, 1fr);
+    gap: 1.5rem;
+}
+
+@media (max-width: 900px) {
+    .grid { grid-template-columns: 1fr; }
+}
+
+.card {
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 8px;
+}
+
+.card-header {
+    padding: 1rem 1.25rem;
+    border-bottom: 1px solid var(--border);
+    font-weight: 500;
+    font-size: 0.875rem;
+}
+
+.card-body {
+    padding: 1.25rem;
+}
+
+.url-display {
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    padding: 0.75rem 1rem;
+    font-family: 'SF Mono', monospace;
+    font-size: 0.8125rem;
+    color: var(--accent);
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 0.5rem;
+}
+
+.url-display a {
+    color: inherit;
+    text-decoration: none;
+}
+
+.url-display a:hover { text-decoration: underline; }
+
+.copy-btn {
+    background: none;
+    border: none;
+    color: var(--text-muted);
+    cursor: pointer;
+    font-size: 0.75rem;
+}
+
+.copy-btn:hover { color: var(--text); }
+
+.help-text {
+    font-size: 0.75rem;
+    color: var(--text-muted);
+}
+
+.service-list {
+    display: flex;
+    flex-direction: column;
+    gap: 0.5rem;
+}
+
+.service-item {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 0.75rem 1rem;
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+}
+
+.service-info {
+    display: flex;
+    align-items: center;
+    gap: 0.75rem;
+}
+
+.service-name {
+    font-weight: 500;
+    font-size: 0.875rem;
+}
+
+.service-status {
+    font-size: 0.75rem;
+    color: var(--text-muted);
+}
+
+.btn {
+    padding: 0.375rem 0.75rem;
+    background: var(--surface-2);
+    color: var(--text-secondary);
+    border: 1px solid var(--border);
+    border-radius: 4px;
+    font-family: inherit;
+    font-size: 0.75rem;
+    cursor: pointer;
+}
+
+.btn:hover {
+    background: var(--border);
+    color: var(--text);
+}
+
+.btn:disabled {
+    opacity: 0.5;
+    cursor: not-allowed;
+}
+
+.btn-primary {
+    background: var(--accent);
+    color: white;
+    border-color: var(--accent);
+}
+
+.btn-primary:hover { background: var(--accent-hover); }
+
+.form-group {
+    margin-bottom: 1rem;
+}
+
+.form-group:last-of-type {
+    margin-bottom: 1.25rem;
+}
+
+label {
+    display: block;
+    font-size: 0.75rem;
+    color: var(--text-muted);
+    margin-bottom: 0.375rem;
+}
+
+input[type="text"], input[type="url"], input[type="number"] {
+    width: 100%;
+    padding: 0.5rem 0.75rem;
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 4px;
+    color: var(--text);
+    font-family: inherit;
+    font-size: 0.8125rem;
+}
+
+input:focus {
+    outline: none;
+    border-color: var(--accent);
+}
+
+.mono { font-family: 'SF Mono', monospace; }
+
+.logs-card { grid-column: 1 / -1; }
+
+.log-tabs {
+    display: flex;
+    gap: 0.25rem;
+}
+
+.log-tab {
+    padding: 0.375rem 0.75rem;
+    background: transparent;
+    border: none;
+    color: var(--text-muted);
+    font-family: inherit;
+    font-size: 0.75rem;
+    cursor: pointer;
+    border-radius: 4px;
+}
+
+.log-tab:hover { color: var(--text-secondary); }
+.log-tab.active {
+    background: var(--surface-2);
+    color: var(--text);
+}
+
+.logs {
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    padding: 0.5rem 0;
+    height: 300px;
+    overflow: auto;
+    position: relative;
+    font-family: 'SF Mono', monospace;
+    font-size: 0.6875rem;
+    line-height: 1.6;
+}
+
+/* Only the visible lines exist in the DOM: the spacer is as tall as
+   the whole buffer and the window is moved to the scroll position */
+.log-spacer { position: relative; }
+
+.log-window {
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    will-change: transform;
+}
+
+.log-line {
+    /* Fixed height (no wrapping) so a line's offset is index * height */
+    height: 1.6em;
+    padding: 0 1rem;
+    white-space: pre;
+    color: var(--text-muted);
+}
+
+.log-line.error { color: var(--red); }
+.log-line.warning { color: var(--yellow); }
+
+.toast {
+    position: fixed;
+    bottom: 1.5rem;
+    right: 1.5rem;
+    padding: 0.75rem 1rem;
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    font-size: 0.8125rem;
+    animation: slideIn 0.2s ease;
+}
+
+.toast.success { border-color: var(--green); }
+.toast.error { border-color: var(--red); }
+
+@keyframes slideIn {
+    from { transform: translateY(0.5rem); opacity: 0; }
+    to { transform: translateY(0); opacity: 1; }
+}
+
+.health-bar {
+    display: flex;
+    gap: 1.5rem;
+    padding: 1rem 1.25rem;
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 8px;
+    margin-bottom: 1.5rem;
+    flex-wrap: wrap;
+}
+
+.health-item {
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+    font-size: 0.8125rem;
+    color: var(--text-secondary);
+}
+
+.queue-badge {
+    background: var(--surface-2);
+    padding: 0.125rem 0.5rem;
+    border-radius: 4px;
+    font-family: 'SF Mono', monospace;
+    font-size: 0.75rem;
+}
+
+.queue-badge.warning {
+    background: rgba(234, 179, 8, 0.2);
+    color: var(--yellow);
+}
+
+.action-group {
+    margin-bottom: 1.25rem;
+}
+
+.action-group:last-child {
+    margin-bottom: 0;
+}
+
+.action-label {
+    font-size: 0.6875rem;
+    font-weight: 500;
+    text-transform: uppercase;
+    letter-spacing: 0.05em;
+    color: var(--text-muted);
+    margin-bottom: 0.5rem;
+}
+
+.action-buttons {
+    display: flex;
+    gap: 0.5rem;
+    flex-wrap: wrap;
+}
+
+.update-row {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    gap: 1rem;
+}
+
+.update-status {
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+    font-size: 0.8125rem;
+    color: var(--text-secondary);
+}
+
+.update-status.up-to-date {
+    color: var(--green);
+}
+
+.update-status.has-update {
+    color: var(--yellow);
+}
+
+.update-status .version {
+    font-family: 'SF Mono', monospace;
+    font-size: 0.75rem;
+    color: var(--text-muted);
+}
+
+.spinner {
+    width: 14px;
+    height: 14px;
+    border: 2px solid var(--border);
+    border-top-color: var(--accent);
+    border-radius: 50%;
+    animation: spin 0.8s linear infinite;
+}
+
+@keyframes spin {
+    to { transform: rotate(360deg); }
+}
+
+/* Bridge Control Styles */
+.control-status {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 0.75rem 1rem;
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    margin-bottom: 1.25rem;
+}
+
+.control-indicator {
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+    font-size: 0.875rem;
+}
+
+.control-queue {
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+    font-size: 0.75rem;
+    color: var(--text-muted);
+}
+
+.status-dot.paused {
+    background: var(--yellow);
+}
+
+.btn-danger {
+    background: var(--red);
+    color: white;
+    border-color: var(--red);
+}
+
+.btn-danger:hover {
+    background: #dc2626;
+}
+
+.btn-warning {
+    background: var(--yellow);
+    color: #000;
+    border-color: var(--yellow);
+}
+
+.btn-warning:hover {
+    background: #ca8a04;
+}
+
+.btn.active {
+    background: var(--accent);
+    color: white;
+    border-color: var(--accent);
+}
+
+/* Queue modal */
+.modal-overlay {
+    position: fixed;
+    top: 0;
+    left: 0;
+    right: 0;
+    bottom: 0;
+    background: rgba(0, 0, 0, 0.7);
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    z-index: 1000;
+}
+
+.modal {
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 8px;
+    width: 100%;
+    max-width: 600px;
+    max-height: 80vh;
+    overflow: hidden;
+    display: flex;
+    flex-direction: column;
+}
+
+.modal-header {
+    padding: 1rem 1.25rem;
+    border-bottom: 1px solid var(--border);
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.modal-header h3 {
+    font-size: 1rem;
+    font-weight: 500;
+}
+
+.modal-close {
+    background: none;
+    border: none;
+    color: var(--text-muted);
+    cursor: pointer;
+    font-size: 1.25rem;
+}
+
+.modal-close:hover {
+    color: var(--text);
+}
+
+.modal-body {
+    padding: 1.25rem;
+    overflow-y: auto;
+}
+
+.queue-item {
+    padding: 0.75rem;
+    background: var(--bg);
+    border: 1px solid var(--border);
+    border-radius: 4px;
+    margin-bottom: 0.5rem;
+    font-size: 0.8125rem;
+}
+
+.queue-item-header {
+    display: flex;
+    justify-content: space-between;
+    margin-bottom: 0.25rem;
+    font-size: 0.75rem;
+    color: var(--text-muted);
+}
+
+.queue-item-text {
+    color: var(--text);
+}
+
+.empty-queue {
+    text-align: center;
+    color: var(--text-muted);
+    padding: 2rem;
+}
+"""
+
+
+DASHBOARD_JS = """
+// Auth is handled via httponly cookie - sent automatically with requests
+const headers = {};
+
+let currentLog = 'bridge';
+let logWs = null;
+
+// Elements the script updates, looked up once (the script runs
+// after the markup, so they all exist by now)
+const gid = (id) => document.getElementById(id);
+const els = {
+    hBridge: gid('h-bridge'),
+    hNightline: gid('h-nightline'),
+    hChatdb: gid('h-chatdb'),
+    hTunnel: gid('h-tunnel'),
+    queueBadge: document.querySelector('.queue-badge'),
+    services: gid('services'),
+    bridgeName: gid('bridge-name'),
+    bridgeId: gid('bridge-id'),
+    displayName: gid('display-name'),
+    serverUrl: gid('server-url'),
+    clientId: gid('client-id'),
+    webhookSecret: gid('webhook-secret'),
+    tunnelUrl: gid('tunnel-url'),
+    updateStatus: gid('update-status'),
+    updateBtn: gid('update-btn'),
+    controlDot: gid('control-dot'),
+    controlMode: gid('control-mode'),
+    outboundQueueBadge: gid('outbound-queue-badge'),
+    btnPauseOutbound: gid('btn-pause-outbound'),
+    btnPauseInbound: gid('btn-pause-inbound'),
+    btnResume: gid('btn-resume'),
+    btnClearQueue: gid('btn-clear-queue'),
+};
+const logTabs = document.querySelectorAll('.log-tab');
+
+// Write only on change: re-assigning an identical class or text still
+// invalidates the element's style, and most refreshes change nothing
+const setClass = (el, c) => { if (el.className !== c) el.className = c; };
+const setText = (el, t) => { t = String(t); if (el.textContent !== t) el.textContent = t; };
+
+// Health is pushed over /api/status/ws whenever it changes
+let statusWs = null;
+
+const SERVICE_NAMES = {
+    bridge: 'Bridge Server',
+    'tunnel-bridge': 'Bridge Tunnel',
+    'tunnel-manage': 'Management Tunnel',
+    updater: 'Auto Updater'
+};
+// name -> {root, dot, status}
+const svcNodes = new Map();
+
+// Rows are cloned from the <template> in the page, never parsed from HTML
+const serviceRowTemplate = gid('svc-row-tpl').content.firstElementChild;
+
+function createServiceRow(name) {
+    const root = serviceRowTemplate.cloneNode(true);
+    root.querySelector('.service-name').textContent = SERVICE_NAMES[name] || name;
+    root.querySelector('.btn').addEventListener('click', () => restartService(name));
+    return {
+        root,
+        dot: root.querySelector('.status-dot'),
+        status: root.querySelector('.service-status'),
+    };
+}
+
+function connectStatus() {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    statusWs = new WebSocket(`${protocol}//${window.location.host}/api/status/ws`);
+    statusWs.onmessage = (event) => renderStatus(JSON.parse(event.data));
+    statusWs.onclose = () => setTimeout(connectStatus, 3000);
+}
+
+// Ask for a fresh snapshot now (e.g. after restarting a service)
+function refreshStatus() {
+    if (statusWs && statusWs.readyState === WebSocket.OPEN) statusWs.send('refresh');
+}
+
+function renderStatus(data) {
+    try {
+        // Update health bar indicators
+        const setHealth = (el, ok) => setClass(el, 'status-dot' + (ok ? '' : ' offline'));
+
+        // Bridge service running
+        setHealth(els.hBridge, data.services?.bridge);
+
+        // Nightline connection
+        const nightlineOk = data.bridge_health?.nightline?.connected;
+        setHealth(els.hNightline, nightlineOk);
+
+        // Chat.db access  
+        const chatDbOk = data.bridge_health?.watcher?.chat_db_accessible;
+        setHealth(els.hChatdb, chatDbOk);
+
+        // Tunnel running
+        setHealth(els.hTunnel, data.services?.['tunnel-bridge']);
+
+        // Queue size
+        const queueSize = data.bridge_health?.queue?.size || 0;
+        setText(els.queueBadge, queueSize);
+        setClass(els.queueBadge, 'queue-badge' + (queueSize > 10 ? ' warning' : ''));
+
+        // Update services list in place: one row per service, built
+        // once, then only its dot and status text change
+        const seen = new Set();
+        for (const [name, running] of Object.entries(data.services)) {
+            if (name === 'management') continue;
+            seen.add(name);
+            let node = svcNodes.get(name);
+            if (!node) {
+                node = createServiceRow(name);
+                svcNodes.set(name, node);
+                els.services.appendChild(node.root);
+            }
+            setClass(node.dot, 'status-dot' + (running ? '' : ' offline'));
+            setText(node.status, running ? 'Running' : 'Stopped');
+        }
+        for (const [name, node] of svcNodes) {
+            if (!seen.has(name)) {
+                node.root.remove();
+                svcNodes.delete(name);
+            }
+        }
+
+    } catch (e) {
+        console.error('Status render failed:', e);
+    }
+}
+
+async function loadConfig() {
+    try {
+        const res = await fetch('/api/config', { credentials: 'same-origin' });
+        const data = await res.json();
+
+        // Update header with display name and identifier
+        const displayName = data.config.display_name || 'iPhone Bridge';
+        const clientId = data.config.nightline_client_id || '';
+
+        els.bridgeName.textContent = displayName;
+        els.bridgeId.textContent = clientId 
+            ? `bridge-${clientId.substring(0, 8)}` 
+            : 'Not configured';
+
+        // Update form fields
+        els.displayName.value = data.config.display_name || '';
+        els.serverUrl.value = data.config.nightline_server_url || '';
+        els.clientId.value = data.config.nightline_client_id || '';
+        els.webhookSecret.value = data.config.webhook_secret || '';
+
+        const tunnelUrl = data.tunnel_url || 'Not configured';
+        const urlEl = els.tunnelUrl;
+        urlEl.textContent = tunnelUrl;
+        urlEl.href = tunnelUrl.startsWith('http') ? tunnelUrl : '#';
+    } catch (e) {
+        console.error('Config load failed:', e);
+    }
+}
+
+function copyIdentifier() {
+    navigator.clipboard.writeText(els.bridgeId.textContent);
+    showToast('Identifier copied', 'success');
+}
+
+async function restartService(name) {
+    if (name === 'management') {
+        if (!confirm('This will restart the management agent. You may need to refresh the page. Continue?')) {
+            return;
+        }
+    }
+
+    try {
+        const res = await fetch(`/api/services/${name}/restart`, { method: 'POST', credentials: 'same-origin' });
+        const data = await res.json();
+        showToast(data.message, data.success ? 'success' : 'error');
+
+        if (name === 'management' && data.success) {
+            showToast('Reconnecting...', 'success');
+            waitAndReload();
+        } else {
+            setTimeout(refreshStatus, 2000);
+        }
+    } catch (e) {
+        showToast('Failed to restart', 'error');
+    }
+}
+
+async function checkBridgeHealth() {
+    try {
+        const res = await fetch('http://localhost:8080/health');
+        const data = await res.json();
+        showToast(`Bridge: ${data.status}`, data.status === 'healthy' ? 'success' : 'error');
+    } catch (e) {
+        showToast('Bridge unreachable', 'error');
+    }
+}
+
+async function reconfigureTunnels() {
+    if (!confirm('Reconfigure Cloudflare tunnels for current client ID? This will create new tunnels if needed and update launchd services.')) {
+        return;
+    }
+
+    showToast('Reconfiguring tunnels...', 'success');
+
+    try {
+        const res = await fetch('/api/services/tunnel/reconfigure', { 
+            method: 'POST',
+            credentials: 'same-origin' 
+        });
+        const data = await res.json();
+
+        if (data.success) {
+            showToast('Tunnels reconfigured successfully!', 'success');
+            setTimeout(refreshStatus, 2000);
+        } else {
+            showToast(`Tunnel reconfiguration failed: ${data.errors.join(', ')}`, 'error');
+        }
+    } catch (e) {
+        showToast('Failed to reconfigure tunnels', 'error');
+    }
+}
+
+async function checkForUpdates() {
+    const status = els.updateStatus;
+    const btn = els.updateBtn;
+
+    status.className = 'update-status';
+    status.innerHTML = '<span class="spinner"></span><span>Checking for updates...</span>';
+    btn.style.display = 'none';
+
+    try {
+        const res = await fetch('/api/update', { credentials: 'same-origin' });
+        const data = await res.json();
+
+        if (data.has_updates) {
+            status.className = 'update-status has-update';
+            status.innerHTML = `Update available <span class="version">${data.current_commit} → ${data.remote_commit}</span>`;
+            btn.style.display = 'inline-block';
+            btn.textContent = 'Update Now';
+            btn.className = 'btn btn-primary';
+            btn.disabled = false;
+            btn.onclick = performUpdate;
+        } else {
+            status.className = 'update-status up-to-date';
+            status.innerHTML = `Up to date <span class="version">${data.current_commit}</span>`;
+            btn.style.display = 'inline-block';
+            btn.textContent = 'Check';
+            btn.className = 'btn';
+            btn.disabled = false;
+            btn.onclick = checkForUpdates;
+        }
+    } catch (e) {
+        status.className = 'update-status';
+        status.innerHTML = 'Failed to check for updates';
+        btn.style.display = 'block';
+        btn.textContent = 'Retry';
+        btn.onclick = checkForUpdates;
+    }
+}
+
+// Reload once the management agent is back up after a restart.
+// The old process keeps answering /health until it's replaced (an
+// update runs git pull and pip first), so wait for one whose uptime
+// began after we asked; give up and reload anyway after ~2 minutes.
+async function waitAndReload() {
+    const requestedAt = Date.now();
+    for (let delay = 200; Date.now() - requestedAt < 120000; delay = Math.min(delay * 1.5, 5000)) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        try {
+            const res = await fetch('/health', { cache: 'no-store' });
+            if (!res.ok) continue;
+            const data = await res.json();
+            if (data.uptime_seconds * 1000 < Date.now() - requestedAt) break;
+        } catch (e) {
+            // Down while restarting - keep waiting
+        }
+    }
+    window.location.reload();
+}
+
+async function performUpdate() {
+    const status = els.updateStatus;
+    const btn = els.updateBtn;
+
+    status.className = 'update-status';
+    status.innerHTML = '<span class="spinner"></span><span>Updating...</span>';
+    btn.disabled = true;
+
+    try {
+        const res = await fetch('/api/update', { method: 'POST', credentials: 'same-origin' });
+        const data = await res.json();
+
+        if (data.success) {
+            status.innerHTML = '<span class="spinner"></span><span>Restarting services...</span>';
+            waitAndReload();
+        } else {
+            status.innerHTML = 'Update failed';
+            btn.disabled = false;
+            btn.textContent = 'Retry';
+        }
+    } catch (e) {
+        status.innerHTML = 'Update failed';
+        btn.disabled = false;
+        btn.textContent = 'Retry';
+    }
+}
+
+document.getElementById('config-form').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const update = {
+        display_name: els.displayName.value,
+        nightline_server_url: els.serverUrl.value,
+        nightline_client_id: els.clientId.value,
+        webhook_secret: els.webhookSecret.value,
+    };
+
+    try {
+        const res = await fetch('/api/config', {
+            method: 'PATCH',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify(update),
+        });
+        const data = await res.json();
+
+        if (data.success) {
+            // Update header immediately with new display name
+            if (update.display_name) {
+                els.bridgeName.textContent = update.display_name;
+            }
+            showToast('Config saved. Restarting bridge...', 'success');
+            await restartService('bridge');
+        } else {
+            showToast(data.detail || 'Failed to save', 'error');
+        }
+    } catch (e) {
+        showToast('Failed to save config', 'error');
+    }
+});
+
+// Log viewer: the last LOG_LIMIT lines live in a ring buffer and only
+// the ~20 that fit the viewport are rendered, at most once per frame.
+// requestAnimationFrame doesn't fire in background tabs, so a hidden
+// dashboard just fills the buffer.
+const LOG_LIMIT = 500;
+const logBuf = new Array(LOG_LIMIT);
+const logClass = new Array(LOG_LIMIT);  // class for the line at the same index
+// One scan per line; the level comes first in our log format
+const LOG_LEVEL_RE = /ERROR|WARNING/;
+let logHead = 0;
+let logSize = 0;
+let logLineHeight = 0;
+let logStickToBottom = true;
+let logRenderScheduled = false;
+const logsEl = gid('logs');
+const logSpacer = gid('log-spacer');
+const logWindow = gid('log-window');
+
+function pushLog(text) {
+    const slot = (logHead + logSize) % LOG_LIMIT;
+    const level = LOG_LEVEL_RE.exec(text);
+    logBuf[slot] = text;
+    logClass[slot] = level === null ? 'log-line'
+        : level[0] === 'ERROR' ? 'log-line error' : 'log-line warning';
+    if (logSize < LOG_LIMIT) logSize++;
+    else logHead = (logHead + 1) % LOG_LIMIT;
+    scheduleLogRender();
+}
+
+function resetLogs(text) {
+    logHead = 0;
+    logSize = 0;
+    logStickToBottom = true;
+    if (text) pushLog(text);
+    else scheduleLogRender();
+}
+
+function scheduleLogRender() {
+    if (logRenderScheduled) return;
+    logRenderScheduled = true;
+    requestAnimationFrame(renderLogs);
+}
+
+function renderLogs() {
+    logRenderScheduled = false;
+    if (!logLineHeight) {
+        const probe = document.createElement('div');
+        probe.className = 'log-line';
+        probe.textContent = ' ';
+        logWindow.replaceChildren(probe);
+        logLineHeight = probe.getBoundingClientRect().height || 17.6;
+    }
+
+    logSpacer.style.height = `${logSize * logLineHeight}px`;
+    if (logStickToBottom) logsEl.scrollTop = logsEl.scrollHeight;
+
+    const top = Math.max(0, logsEl.scrollTop - logSpacer.offsetTop);
+    const first = Math.floor(top / logLineHeight);
+    const last = Math.min(logSize, first + Math.ceil(logsEl.clientHeight / logLineHeight) + 1);
+
+    const frag = document.createDocumentFragment();
+    for (let i = first; i < last; i++) {
+        const slot = (logHead + i) % LOG_LIMIT;
+        const line = document.createElement('div');
+        line.className = logClass[slot];
+        line.textContent = logBuf[slot];
+        frag.appendChild(line);
+    }
+    logWindow.replaceChildren(frag);
+    logWindow.style.transform = `translate3d(0, ${first * logLineHeight}px, 0)`;
+}
+
+// Follow new lines only while the user is at (or near) the bottom
+logsEl.addEventListener('scroll', () => {
+    logStickToBottom = logsEl.scrollHeight - logsEl.scrollTop - logsEl.clientHeight < 20;
+    scheduleLogRender();
+}, { passive: true });
+
+// Pending reconnect after a dropped log stream (at most one at a time)
+let logReconnectTimer = null;
+
+function disconnectLogs() {
+    clearTimeout(logReconnectTimer);
+    logReconnectTimer = null;
+    if (logWs) {
+        // Detach first so closing on purpose doesn't schedule a reconnect
+        // or deliver stray lines from the old stream
+        logWs.onclose = logWs.onmessage = logWs.onopen = null;
+        logWs.close();
+        logWs = null;
+    }
+}
+
+function connectLogs(logName) {
+    disconnectLogs();
+    resetLogs('Connecting...');
+
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    logWs = new WebSocket(`${protocol}//${window.location.host}/api/logs/ws/${logName}`);
+
+    logWs.onopen = () => resetLogs();
+
+    logWs.onmessage = (event) => pushLog(event.data);
+
+    logWs.onclose = () => {
+        logWs = null;
+        if (!document.hidden) logReconnectTimer = setTimeout(() => connectLogs(currentLog), 3000);
+    };
+}
+
+// No log stream while the tab is hidden: the server runs a tail -f per
+// connection, and nothing is rendered in the background anyway
+document.addEventListener('visibilitychange', () => {
+    if (document.hidden) disconnectLogs();
+    else if (!logWs) connectLogs(currentLog);
+});
+
+logTabs.forEach(tab => {
+    tab.addEventListener('click', () => {
+        logTabs.forEach(t => t.classList.remove('active'));
+        tab.classList.add('active');
+        currentLog = tab.dataset.log;
+        connectLogs(currentLog);
+    });
+});
+
+function copyUrl(id) {
+    const text = document.getElementById(id).textContent;
+    navigator.clipboard.writeText(text);
+    showToast('Copied', 'success');
+}
+
+function showToast(message, type = 'success') {
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+    toast.textContent = message;
+    document.body.appendChild(toast);
+    setTimeout(() => toast.remove(), 3000);
+}
+
+// ============================================
+// Bridge Control Functions
+// ============================================
+
+let controlState = {
+    pause_inbound: false,
+    pause_outbound: false,
+    outbound_queue_size: 0,
+};
+
+async function loadControlStatus() {
+    try {
+        const res = await fetch('/api/control/status', { credentials: 'same-origin' });
+        if (res.ok) {
+            const data = await res.json();
+            controlState = data;
+            updateControlUI();
+        }
+    } catch (e) {
+        console.error('Failed to load control status:', e);
+    }
+}
+
+function updateControlUI() {
+    const dot = els.controlDot;
+    const mode = els.controlMode;
+    const queueBadge = els.outboundQueueBadge;
+    const btnPauseOutbound = els.btnPauseOutbound;
+    const btnPauseInbound = els.btnPauseInbound;
+    const btnResume = els.btnResume;
+    const btnClearQueue = els.btnClearQueue;
+
+    // Update queue badge
+    setText(queueBadge, controlState.outbound_queue_size);
+    setClass(queueBadge, 'queue-badge' + (controlState.outbound_queue_size > 0 ? ' warning' : ''));
+
+    // Update status indicator (toggle with a force flag is a no-op
+    // when the class is already in the wanted state)
+    if (controlState.pause_inbound) {
+        setClass(dot, 'status-dot paused');
+        setText(mode, 'Paused (All)');
+    } else if (controlState.pause_outbound) {
+        setClass(dot, 'status-dot paused');
+        setText(mode, 'Paused (Outbound)');
+    } else {
+        setClass(dot, 'status-dot');
+        setText(mode, 'Running');
+    }
+    btnPauseInbound.classList.toggle('active', !!controlState.pause_inbound);
+    btnPauseOutbound.classList.toggle('active', !controlState.pause_inbound && !!controlState.pause_outbound);
+
+    // Enable/disable buttons
+    btnResume.disabled = !controlState.pause_inbound && !controlState.pause_outbound;
+    btnClearQueue.disabled = controlState.outbound_queue_size === 0;
+}
+
+async function pauseBridge(type) {
+    const payload = {
+        pause_inbound: type === 'inbound',
+        pause_outbound: type === 'outbound' || type === 'inbound',
+    };
+
+    try {
+        const res = await fetch('/api/control/pause', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify(payload),
+        });
+
+        const data = await res.json();
+
+        if (res.ok) {
+            controlState = {
+                ...controlState,
+                pause_inbound: data.pause_inbound,
+                pause_outbound: data.pause_outbound,
+                outbound_queue_size: data.outbound_queue_size,
+            };
+            updateControlUI();
+            showToast(data.message, 'success');
+        } else {
+            showToast(data.detail || 'Failed to pause', 'error');
+        }
+    } catch (e) {
+        showToast('Failed to pause bridge', 'error');
+    }
+}
+
+async function resumeBridge() {
+    const sendQueued = controlState.outbound_queue_size > 0 
+        ? confirm(`Send ${controlState.outbound_queue_size} queued messages?`)
+        : true;
+
+    try {
+        const res = await fetch(`/api/control/resume?send_queued=${sendQueued}`, {
+            method: 'POST',
+            credentials: 'same-origin',
+        });
+
+        const data = await res.json();
+
+        if (res.ok) {
+            controlState = {
+                ...controlState,
+                pause_inbound: data.pause_inbound,
+                pause_outbound: data.pause_outbound,
+                outbound_queue_size: data.outbound_queue_size,
+            };
+            updateControlUI();
+            showToast(data.message, 'success');
+        } else {
+            showToast(data.detail || 'Failed to resume', 'error');
+        }
+    } catch (e) {
+        showToast('Failed to resume bridge', 'error');
+    }
+}
+
+async function clearQueue() {
+    if (!confirm('Clear all queued messages without sending? This cannot be undone.')) {
+        return;
+    }
+
+    try {
+        const res = await fetch('/api/control/clear-queue', {
+            method: 'POST',
+            credentials: 'same-origin',
+        });
+
+        const data = await res.json();
+
+        if (res.ok) {
+            controlState.outbound_queue_size = 0;
+            updateControlUI();
+            showToast(data.message, 'success');
+        } else {
+            showToast(data.detail || 'Failed to clear queue', 'error');
+        }
+    } catch (e) {
+        showToast('Failed to clear queue', 'error');
+    }
+}
+
+async function viewQueue() {
+    try {
+        const res = await fetch('/api/control/status', { credentials: 'same-origin' });
+        const data = await res.json();
+
+        // Create modal
+        const overlay = document.createElement('div');
+        overlay.className = 'modal-overlay';
+        overlay.onclick = (e) => {
+            if (e.target === overlay) overlay.remove();
+        };
+
+        const queueItems = data.outbound_queue.length > 0
+            ? data.outbound_queue.map(item => `
+                <div class="queue-item">
+                    <div class="queue-item-header">
+                        <span>To: ${item.phone}</span>
+                        <span>${new Date(item.queued_at * 1000).toLocaleTimeString()}</span>
+                    </div>
+                    <div class="queue-item-text">${escapeHtml(item.text_preview)}</div>
+                </div>
+            `).join('')
+            : '<div class="empty-queue">No messages in queue</div>';
+
+        overlay.innerHTML = `
+            <div class="modal">
+                <div class="modal-header">
+                    <h3>Outbound Queue (${data.outbound_queue.length})</h3>
+                    <button class="modal-close" onclick="this.closest('.modal-overlay').remove()">×</button>
+                </div>
+                <div class="modal-body">
+                    ${queueItems}
+                </div>
+            </div>
+        `;
+
+        document.body.appendChild(overlay);
+    } catch (e) {
+        showToast('Failed to load queue', 'error');
+    }
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// ============================================
+// Init
+// ============================================
+connectStatus();
+loadConfig();
+loadControlStatus();
+checkForUpdates();
+connectLogs(currentLog);
+setInterval(loadControlStatus, 5000);
+"""
+
+
 DASHBOARD_HTML = """
 <!DOCTYPE html>
 <html lang="en">
@@ -236,585 +1621,7 @@ DASHBOARD_HTML = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>iPhone Bridge</title>
-    <style>
-        :root {
-            --bg: #09090b;
-            --surface: #18181b;
-            --surface-2: #27272a;
-            --border: #3f3f46;
-            --text: #fafafa;
-            --text-secondary: #a1a1aa;
-            --text-muted: #71717a;
-            --accent: #3b82f6;
-            --accent-hover: #2563eb;
-            --green: #22c55e;
-            --red: #ef4444;
-            --yellow: #eab308;
-        }
-        
-        * { box-sizing: border-box; margin: 0; padding: 0; }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            line-height: 1.5;
-            min-height: 100vh;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-        
-        header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 2rem;
-            padding-bottom: 1.5rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        .header-left {
-            display: flex;
-            flex-direction: column;
-            gap: 0.375rem;
-        }
-        
-        header h1 {
-            font-size: 1.5rem;
-            font-weight: 600;
-        }
-        
-        .identifier-badge {
-            display: inline-flex;
-            align-items: center;
-            gap: 0.375rem;
-            padding: 0.25rem 0.5rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            font-family: 'SF Mono', monospace;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-            cursor: pointer;
-            width: fit-content;
-        }
-        
-        .identifier-badge:hover {
-            color: var(--text-secondary);
-            border-color: var(--text-muted);
-        }
-        
-        .identifier-badge .copy-icon {
-            opacity: 0.5;
-            flex-shrink: 0;
-        }
-        
-        .identifier-badge:hover .copy-icon {
-            opacity: 1;
-        }
-        
-        .identifier-badge svg {
-            display: block;
-        }
-        
-        .header-right {
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-        }
-        
-        .status-badge {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.375rem 0.75rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 9999px;
-            font-size: 0.8125rem;
-        }
-        
-        .status-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: var(--green);
-        }
-        
-        .status-dot.offline { background: var(--red); }
-        .status-dot.degraded { background: var(--yellow); }
-        
-        .logout-btn {
-            color: var(--text-muted);
-            text-decoration: none;
-            font-size: 0.8125rem;
-        }
-        
-        .logout-btn:hover { color: var(--text); }
-        
-        .grid {
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 1.5rem;
-        }
-        
-        @media (max-width: 900px) {
-            .grid { grid-template-columns: 1fr; }
-        }
-        
-        .card {
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-        }
-        
-        .card-header {
-            padding: 1rem 1.25rem;
-            border-bottom: 1px solid var(--border);
-            font-weight: 500;
-            font-size: 0.875rem;
-        }
-        
-        .card-body {
-            padding: 1.25rem;
-        }
-        
-        .url-display {
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            padding: 0.75rem 1rem;
-            font-family: 'SF Mono', monospace;
-            font-size: 0.8125rem;
-            color: var(--accent);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 0.5rem;
-        }
-        
-        .url-display a {
-            color: inherit;
-            text-decoration: none;
-        }
-        
-        .url-display a:hover { text-decoration: underline; }
-        
-        .copy-btn {
-            background: none;
-            border: none;
-            color: var(--text-muted);
-            cursor: pointer;
-            font-size: 0.75rem;
-        }
-        
-        .copy-btn:hover { color: var(--text); }
-        
-        .help-text {
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .service-list {
-            display: flex;
-            flex-direction: column;
-            gap: 0.5rem;
-        }
-        
-        .service-item {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 0.75rem 1rem;
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-        }
-        
-        .service-info {
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-        }
-        
-        .service-name {
-            font-weight: 500;
-            font-size: 0.875rem;
-        }
-        
-        .service-status {
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .btn {
-            padding: 0.375rem 0.75rem;
-            background: var(--surface-2);
-            color: var(--text-secondary);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            font-family: inherit;
-            font-size: 0.75rem;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            background: var(--border);
-            color: var(--text);
-        }
-        
-        .btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-        
-        .btn-primary {
-            background: var(--accent);
-            color: white;
-            border-color: var(--accent);
-        }
-        
-        .btn-primary:hover { background: var(--accent-hover); }
-        
-        .form-group {
-            margin-bottom: 1rem;
-        }
-        
-        .form-group:last-of-type {
-            margin-bottom: 1.25rem;
-        }
-        
-        label {
-            display: block;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-            margin-bottom: 0.375rem;
-        }
-        
-        input[type="text"], input[type="url"], input[type="number"] {
-            width: 100%;
-            padding: 0.5rem 0.75rem;
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            color: var(--text);
-            font-family: inherit;
-            font-size: 0.8125rem;
-        }
-        
-        input:focus {
-            outline: none;
-            border-color: var(--accent);
-        }
-        
-        .mono { font-family: 'SF Mono', monospace; }
-        
-        .logs-card { grid-column: 1 / -1; }
-        
-        .log-tabs {
-            display: flex;
-            gap: 0.25rem;
-        }
-        
-        .log-tab {
-            padding: 0.375rem 0.75rem;
-            background: transparent;
-            border: none;
-            color: var(--text-muted);
-            font-family: inherit;
-            font-size: 0.75rem;
-            cursor: pointer;
-            border-radius: 4px;
-        }
-        
-        .log-tab:hover { color: var(--text-secondary); }
-        .log-tab.active {
-            background: var(--surface-2);
-            color: var(--text);
-        }
-        
-        .logs {
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            padding: 1rem;
-            height: 300px;
-            overflow-y: auto;
-            font-family: 'SF Mono', monospace;
-            font-size: 0.6875rem;
-            line-height: 1.6;
-        }
-        
-        .log-line {
-            white-space: pre-wrap;
-            word-break: break-all;
-            color: var(--text-muted);
-        }
-        
-        .log-line.error { color: var(--red); }
-        .log-line.warning { color: var(--yellow); }
-        
-        .toast {
-            position: fixed;
-            bottom: 1.5rem;
-            right: 1.5rem;
-            padding: 0.75rem 1rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            font-size: 0.8125rem;
-            animation: slideIn 0.2s ease;
-        }
-        
-        .toast.success { border-color: var(--green); }
-        .toast.error { border-color: var(--red); }
-        
-        @keyframes slideIn {
-            from { transform: translateY(0.5rem); opacity: 0; }
-            to { transform: translateY(0); opacity: 1; }
-        }
-        
-        .health-bar {
-            display: flex;
-            gap: 1.5rem;
-            padding: 1rem 1.25rem;
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            margin-bottom: 1.5rem;
-            flex-wrap: wrap;
-        }
-        
-        .health-item {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            font-size: 0.8125rem;
-            color: var(--text-secondary);
-        }
-        
-        .queue-badge {
-            background: var(--surface-2);
-            padding: 0.125rem 0.5rem;
-            border-radius: 4px;
-            font-family: 'SF Mono', monospace;
-            font-size: 0.75rem;
-        }
-        
-        .queue-badge.warning {
-            background: rgba(234, 179, 8, 0.2);
-            color: var(--yellow);
-        }
-        
-        .action-group {
-            margin-bottom: 1.25rem;
-        }
-        
-        .action-group:last-child {
-            margin-bottom: 0;
-        }
-        
-        .action-label {
-            font-size: 0.6875rem;
-            font-weight: 500;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            color: var(--text-muted);
-            margin-bottom: 0.5rem;
-        }
-        
-        .action-buttons {
-            display: flex;
-            gap: 0.5rem;
-            flex-wrap: wrap;
-        }
-        
-        .update-row {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            gap: 1rem;
-        }
-        
-        .update-status {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            font-size: 0.8125rem;
-            color: var(--text-secondary);
-        }
-        
-        .update-status.up-to-date {
-            color: var(--green);
-        }
-        
-        .update-status.has-update {
-            color: var(--yellow);
-        }
-        
-        .update-status .version {
-            font-family: 'SF Mono', monospace;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .spinner {
-            width: 14px;
-            height: 14px;
-            border: 2px solid var(--border);
-            border-top-color: var(--accent);
-            border-radius: 50%;
-            animation: spin 0.8s linear infinite;
-        }
-        
-        @keyframes spin {
-            to { transform: rotate(360deg); }
-        }
-        
-        /* Bridge Control Styles */
-        .control-status {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 0.75rem 1rem;
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            margin-bottom: 1.25rem;
-        }
-        
-        .control-indicator {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            font-size: 0.875rem;
-        }
-        
-        .control-queue {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .status-dot.paused {
-            background: var(--yellow);
-        }
-        
-        .btn-danger {
-            background: var(--red);
-            color: white;
-            border-color: var(--red);
-        }
-        
-        .btn-danger:hover {
-            background: #dc2626;
-        }
-        
-        .btn-warning {
-            background: var(--yellow);
-            color: #000;
-            border-color: var(--yellow);
-        }
-        
-        .btn-warning:hover {
-            background: #ca8a04;
-        }
-        
-        .btn.active {
-            background: var(--accent);
-            color: white;
-            border-color: var(--accent);
-        }
-        
-        /* Queue modal */
-        .modal-overlay {
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: rgba(0, 0, 0, 0.7);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            z-index: 1000;
-        }
-        
-        .modal {
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            width: 100%;
-            max-width: 600px;
-            max-height: 80vh;
-            overflow: hidden;
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .modal-header {
-            padding: 1rem 1.25rem;
-            border-bottom: 1px solid var(--border);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        
-        .modal-header h3 {
-            font-size: 1rem;
-            font-weight: 500;
-        }
-        
-        .modal-close {
-            background: none;
-            border: none;
-            color: var(--text-muted);
-            cursor: pointer;
-            font-size: 1.25rem;
-        }
-        
-        .modal-close:hover {
-            color: var(--text);
-        }
-        
-        .modal-body {
-            padding: 1.25rem;
-            overflow-y: auto;
-        }
-        
-        .queue-item {
-            padding: 0.75rem;
-            background: var(--bg);
-            border: 1px solid var(--border);
-            border-radius: 4px;
-            margin-bottom: 0.5rem;
-            font-size: 0.8125rem;
-        }
-        
-        .queue-item-header {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 0.25rem;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .queue-item-text {
-            color: var(--text);
-        }
-        
-        .empty-queue {
-            text-align: center;
-            color: var(--text-muted);
-            padding: 2rem;
-        }
-    </style>
+    <link rel="stylesheet" href="{{CSS_URL}}">
 </head>
 <body>
     <div class="container">
@@ -874,6 +1681,18 @@ DASHBOARD_HTML = """
                 <div class="card-header">Services</div>
                 <div class="card-body">
                     <div class="service-list" id="services"></div>
+                    <template id="svc-row-tpl">
+                        <div class="service-item">
+                            <div class="service-info">
+                                <span class="status-dot"></span>
+                                <div>
+                                    <div class="service-name"></div>
+                                    <div class="service-status"></div>
+                                </div>
+                            </div>
+                            <button class="btn">Restart</button>
+                        </div>
+                    </template>
                 </div>
             </div>
             
@@ -975,532 +1794,47 @@ DASHBOARD_HTML = """
                     </div>
                 </div>
                 <div class="card-body">
-                    <div class="logs" id="logs"></div>
+                    <div class="logs" id="logs"><div class="log-spacer" id="log-spacer"><div class="log-window" id="log-window"></div></div></div>
                 </div>
             </div>
         </div>
     </div>
     
-    <script>
-        // Auth is handled via httponly cookie - sent automatically with requests
-        const headers = {};
-        
-        let currentLog = 'bridge';
-        let logWs = null;
-        
-        async function loadStatus() {
-            try {
-                const res = await fetch('/health', { credentials: 'same-origin' });
-                const data = await res.json();
-                
-                // Update health bar indicators
-                const setHealth = (id, ok) => {
-                    const el = document.getElementById(id);
-                    el.className = 'status-dot' + (ok ? '' : ' offline');
-                };
-                
-                // Bridge service running
-                setHealth('h-bridge', data.services?.bridge);
-                
-                // Nightline connection
-                const nightlineOk = data.bridge_health?.nightline?.connected;
-                setHealth('h-nightline', nightlineOk);
-                
-                // Chat.db access  
-                const chatDbOk = data.bridge_health?.watcher?.chat_db_accessible;
-                setHealth('h-chatdb', chatDbOk);
-                
-                // Tunnel running
-                setHealth('h-tunnel', data.services?.['tunnel-bridge']);
-                
-                // Queue size
-                const queueSize = data.bridge_health?.queue?.size || 0;
-                const queueBadge = document.querySelector('.queue-badge');
-                queueBadge.textContent = queueSize;
-                queueBadge.className = 'queue-badge' + (queueSize > 10 ? ' warning' : '');
-                
-                // Update services list
-                const svcContainer = document.getElementById('services');
-                const svcNames = { 
-                    bridge: 'Bridge Server', 
-                    'tunnel-bridge': 'Bridge Tunnel',
-                    'tunnel-manage': 'Management Tunnel',
-                    updater: 'Auto Updater' 
-                };
-                
-                svcContainer.innerHTML = Object.entries(data.services)
-                    .filter(([k]) => k !== 'management')
-                    .map(([name, running]) => `
-                        <div class="service-item">
-                            <div class="service-info">
-                                <span class="status-dot ${running ? '' : 'offline'}"></span>
-                                <div>
-                                    <div class="service-name">${svcNames[name] || name}</div>
-                                    <div class="service-status">${running ? 'Running' : 'Stopped'}</div>
-                                </div>
-                            </div>
-                            <button class="btn" onclick="restartService('${name}')">Restart</button>
-                        </div>
-                    `).join('');
-                    
-            } catch (e) {
-                console.error('Status load failed:', e);
-            }
-        }
-        
-        async function loadConfig() {
-            try {
-                const res = await fetch('/api/config', { credentials: 'same-origin' });
-                const data = await res.json();
-                
-                // Update header with display name and identifier
-                const displayName = data.config.display_name || 'iPhone Bridge';
-                const clientId = data.config.nightline_client_id || '';
-                
-                document.getElementById('bridge-name').textContent = displayName;
-                document.getElementById('bridge-id').textContent = clientId 
-                    ? `bridge-${clientId.substring(0, 8)}` 
-                    : 'Not configured';
-                
-                // Update form fields
-                document.getElementById('display-name').value = data.config.display_name || '';
-                document.getElementById('server-url').value = data.config.nightline_server_url || '';
-                document.getElementById('client-id').value = data.config.nightline_client_id || '';
-                document.getElementById('webhook-secret').value = data.config.webhook_secret || '';
-                
-                const tunnelUrl = data.tunnel_url || 'Not configured';
-                const urlEl = document.getElementById('tunnel-url');
-                urlEl.textContent = tunnelUrl;
-                urlEl.href = tunnelUrl.startsWith('http') ? tunnelUrl : '#';
-            } catch (e) {
-                console.error('Config load failed:', e);
-            }
-        }
-        
-        function copyIdentifier() {
-            const idEl = document.getElementById('bridge-id');
-            navigator.clipboard.writeText(idEl.textContent);
-            showToast('Identifier copied', 'success');
-        }
-        
-        async function restartService(name) {
-            if (name === 'management') {
-                if (!confirm('This will restart the management agent. You may need to refresh the page. Continue?')) {
-                    return;
-                }
-            }
-            
-            try {
-                const res = await fetch(`/api/services/${name}/restart`, { method: 'POST', credentials: 'same-origin' });
-                const data = await res.json();
-                showToast(data.message, data.success ? 'success' : 'error');
-                
-                if (name === 'management' && data.success) {
-                    showToast('Reconnecting...', 'success');
-                    setTimeout(() => window.location.reload(), 3000);
-                } else {
-                    setTimeout(loadStatus, 2000);
-                }
-            } catch (e) {
-                showToast('Failed to restart', 'error');
-            }
-        }
-        
-        async function checkBridgeHealth() {
-            try {
-                const res = await fetch('http://localhost:8080/health');
-                const data = await res.json();
-                showToast(`Bridge: ${data.status}`, data.status === 'healthy' ? 'success' : 'error');
-            } catch (e) {
-                showToast('Bridge unreachable', 'error');
-            }
-        }
-        
-        async function reconfigureTunnels() {
-            if (!confirm('Reconfigure Cloudflare tunnels for current client ID? This will create new tunnels if needed and update launchd services.')) {
-                return;
-            }
-            
-            showToast('Reconfiguring tunnels...', 'success');
-            
-            try {
-                const res = await fetch('/api/services/tunnel/reconfigure', { 
-                    method: 'POST',
-                    credentials: 'same-origin' 
-                });
-                const data = await res.json();
-                
-                if (data.success) {
-                    showToast('Tunnels reconfigured successfully!', 'success');
-                    setTimeout(loadStatus, 2000);
-                } else {
-                    showToast(`Tunnel reconfiguration failed: ${data.errors.join(', ')}`, 'error');
-                }
-            } catch (e) {
-                showToast('Failed to reconfigure tunnels', 'error');
-            }
-        }
-        
-        async function checkForUpdates() {
-            const status = document.getElementById('update-status');
-            const btn = document.getElementById('update-btn');
-            
-            status.className = 'update-status';
-            status.innerHTML = '<span class="spinner"></span><span>Checking for updates...</span>';
-            btn.style.display = 'none';
-            
-            try {
-                const res = await fetch('/api/update', { credentials: 'same-origin' });
-                const data = await res.json();
-                
-                if (data.has_updates) {
-                    status.className = 'update-status has-update';
-                    status.innerHTML = `Update available <span class="version">${data.current_commit} → ${data.remote_commit}</span>`;
-                    btn.style.display = 'inline-block';
-                    btn.textContent = 'Update Now';
-                    btn.className = 'btn btn-primary';
-                    btn.disabled = false;
-                    btn.onclick = performUpdate;
-                } else {
-                    status.className = 'update-status up-to-date';
-                    status.innerHTML = `Up to date <span class="version">${data.current_commit}</span>`;
-                    btn.style.display = 'inline-block';
-                    btn.textContent = 'Check';
-                    btn.className = 'btn';
-                    btn.disabled = false;
-                    btn.onclick = checkForUpdates;
-                }
-            } catch (e) {
-                status.className = 'update-status';
-                status.innerHTML = 'Failed to check for updates';
-                btn.style.display = 'block';
-                btn.textContent = 'Retry';
-                btn.onclick = checkForUpdates;
-            }
-        }
-        
-        async function performUpdate() {
-            const status = document.getElementById('update-status');
-            const btn = document.getElementById('update-btn');
-            
-            status.className = 'update-status';
-            status.innerHTML = '<span class="spinner"></span><span>Updating...</span>';
-            btn.disabled = true;
-            
-            try {
-                const res = await fetch('/api/update', { method: 'POST', credentials: 'same-origin' });
-                const data = await res.json();
-                
-                if (data.success) {
-                    status.innerHTML = '<span class="spinner"></span><span>Restarting services...</span>';
-                    setTimeout(() => window.location.reload(), 5000);
-                } else {
-                    status.innerHTML = 'Update failed';
-                    btn.disabled = false;
-                    btn.textContent = 'Retry';
-                }
-            } catch (e) {
-                status.innerHTML = 'Update failed';
-                btn.disabled = false;
-                btn.textContent = 'Retry';
-            }
-        }
-        
-        document.getElementById('config-form').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const update = {
-                display_name: document.getElementById('display-name').value,
-                nightline_server_url: document.getElementById('server-url').value,
-                nightline_client_id: document.getElementById('client-id').value,
-                webhook_secret: document.getElementById('webhook-secret').value,
-            };
-            
-            try {
-                const res = await fetch('/api/config', {
-                    method: 'PATCH',
-                    headers: { 'Content-Type': 'application/json' },
-                    credentials: 'same-origin',
-                    body: JSON.stringify(update),
-                });
-                const data = await res.json();
-                
-                if (data.success) {
-                    // Update header immediately with new display name
-                    if (update.display_name) {
-                        document.getElementById('bridge-name').textContent = update.display_name;
-                    }
-                    showToast('Config saved. Restarting bridge...', 'success');
-                    await restartService('bridge');
-                } else {
-                    showToast(data.detail || 'Failed to save', 'error');
-                }
-            } catch (e) {
-                showToast('Failed to save config', 'error');
-            }
-        });
-        
-        function connectLogs(logName) {
-            if (logWs) logWs.close();
-            
-            const container = document.getElementById('logs');
-            container.innerHTML = '<div class="log-line">Connecting...</div>';
-            
-            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            logWs = new WebSocket(`${protocol}//${window.location.host}/api/logs/ws/${logName}`);
-            
-            logWs.onopen = () => { container.innerHTML = ''; };
-            
-            logWs.onmessage = (event) => {
-                const line = document.createElement('div');
-                line.className = 'log-line';
-                if (event.data.includes('ERROR')) line.classList.add('error');
-                else if (event.data.includes('WARNING')) line.classList.add('warning');
-                line.textContent = event.data;
-                container.appendChild(line);
-                container.scrollTop = container.scrollHeight;
-                while (container.children.length > 500) container.removeChild(container.firstChild);
-            };
-            
-            logWs.onclose = () => {
-                setTimeout(() => connectLogs(currentLog), 3000);
-            };
-        }
-        
-        document.querySelectorAll('.log-tab').forEach(tab => {
-            tab.addEventListener('click', () => {
-                document.querySelectorAll('.log-tab').forEach(t => t.classList.remove('active'));
-                tab.classList.add('active');
-                currentLog = tab.dataset.log;
-                connectLogs(currentLog);
-            });
-        });
-        
-        function copyUrl(id) {
-            const text = document.getElementById(id).textContent;
-            navigator.clipboard.writeText(text);
-            showToast('Copied', 'success');
-        }
-        
-        function showToast(message, type = 'success') {
-            const toast = document.createElement('div');
-            toast.className = `toast ${type}`;
-            toast.textContent = message;
-            document.body.appendChild(toast);
-            setTimeout(() => toast.remove(), 3000);
-        }
-        
-        // ============================================
-        // Bridge Control Functions
-        // ============================================
-        
-        let controlState = {
-            pause_inbound: false,
-            pause_outbound: false,
-            outbound_queue_size: 0,
-        };
-        
-        async function loadControlStatus() {
-            try {
-                const res = await fetch('/api/control/status', { credentials: 'same-origin' });
-                if (res.ok) {
-                    const data = await res.json();
-                    controlState = data;
-                    updateControlUI();
-                }
-            } catch (e) {
-                console.error('Failed to load control status:', e);
-            }
-        }
-        
-        function updateControlUI() {
-            const dot = document.getElementById('control-dot');
-            const mode = document.getElementById('control-mode');
-            const queueBadge = document.getElementById('outbound-queue-badge');
-            const btnPauseOutbound = document.getElementById('btn-pause-outbound');
-            const btnPauseInbound = document.getElementById('btn-pause-inbound');
-            const btnResume = document.getElementById('btn-resume');
-            const btnClearQueue = document.getElementById('btn-clear-queue');
-            
-            // Update queue badge
-            queueBadge.textContent = controlState.outbound_queue_size;
-            queueBadge.className = 'queue-badge' + (controlState.outbound_queue_size > 0 ? ' warning' : '');
-            
-            // Update status indicator
-            if (controlState.pause_inbound) {
-                dot.className = 'status-dot paused';
-                mode.textContent = 'Paused (All)';
-                btnPauseInbound.classList.add('active');
-                btnPauseOutbound.classList.remove('active');
-            } else if (controlState.pause_outbound) {
-                dot.className = 'status-dot paused';
-                mode.textContent = 'Paused (Outbound)';
-                btnPauseOutbound.classList.add('active');
-                btnPauseInbound.classList.remove('active');
-            } else {
-                dot.className = 'status-dot';
-                mode.textContent = 'Running';
-                btnPauseOutbound.classList.remove('active');
-                btnPauseInbound.classList.remove('active');
-            }
-            
-            // Enable/disable buttons
-            btnResume.disabled = !controlState.pause_inbound && !controlState.pause_outbound;
-            btnClearQueue.disabled = controlState.outbound_queue_size === 0;
-        }
-        
-        async function pauseBridge(type) {
-            const payload = {
-                pause_inbound: type === 'inbound',
-                pause_outbound: type === 'outbound' || type === 'inbound',
-            };
-            
-            try {
-                const res = await fetch('/api/control/pause', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    credentials: 'same-origin',
-                    body: JSON.stringify(payload),
-                });
-                
-                const data = await res.json();
-                
-                if (res.ok) {
-                    controlState = {
-                        ...controlState,
-                        pause_inbound: data.pause_inbound,
-                        pause_outbound: data.pause_outbound,
-                        outbound_queue_size: data.outbound_queue_size,
-                    };
-                    updateControlUI();
-                    showToast(data.message, 'success');
-                } else {
-                    showToast(data.detail || 'Failed to pause', 'error');
-                }
-            } catch (e) {
-                showToast('Failed to pause bridge', 'error');
-            }
-        }
-        
-        async function resumeBridge() {
-            const sendQueued = controlState.outbound_queue_size > 0 
-                ? confirm(`Send ${controlState.outbound_queue_size} queued messages?`)
-                : true;
-            
-            try {
-                const res = await fetch(`/api/control/resume?send_queued=${sendQueued}`, {
-                    method: 'POST',
-                    credentials: 'same-origin',
-                });
-                
-                const data = await res.json();
-                
-                if (res.ok) {
-                    controlState = {
-                        ...controlState,
-                        pause_inbound: data.pause_inbound,
-                        pause_outbound: data.pause_outbound,
-                        outbound_queue_size: data.outbound_queue_size,
-                    };
-                    updateControlUI();
-                    showToast(data.message, 'success');
-                } else {
-                    showToast(data.detail || 'Failed to resume', 'error');
-                }
-            } catch (e) {
-                showToast('Failed to resume bridge', 'error');
-            }
-        }
-        
-        async function clearQueue() {
-            if (!confirm('Clear all queued messages without sending? This cannot be undone.')) {
-                return;
-            }
-            
-            try {
-                const res = await fetch('/api/control/clear-queue', {
-                    method: 'POST',
-                    credentials: 'same-origin',
-                });
-                
-                const data = await res.json();
-                
-                if (res.ok) {
-                    controlState.outbound_queue_size = 0;
-                    updateControlUI();
-                    showToast(data.message, 'success');
-                } else {
-                    showToast(data.detail || 'Failed to clear queue', 'error');
-                }
-            } catch (e) {
-                showToast('Failed to clear queue', 'error');
-            }
-        }
-        
-        async function viewQueue() {
-            try {
-                const res = await fetch('/api/control/status', { credentials: 'same-origin' });
-                const data = await res.json();
-                
-                // Create modal
-                const overlay = document.createElement('div');
-                overlay.className = 'modal-overlay';
-                overlay.onclick = (e) => {
-                    if (e.target === overlay) overlay.remove();
-                };
-                
-                const queueItems = data.outbound_queue.length > 0
-                    ? data.outbound_queue.map(item => `
-                        <div class="queue-item">
-                            <div class="queue-item-header">
-                                <span>To: ${item.phone}</span>
-                                <span>${new Date(item.queued_at * 1000).toLocaleTimeString()}</span>
-                            </div>
-                            <div class="queue-item-text">${escapeHtml(item.text_preview)}</div>
-                        </div>
-                    `).join('')
-                    : '<div class="empty-queue">No messages in queue</div>';
-                
-                overlay.innerHTML = `
-                    <div class="modal">
-                        <div class="modal-header">
-                            <h3>Outbound Queue (${data.outbound_queue.length})</h3>
-                            <button class="modal-close" onclick="this.closest('.modal-overlay').remove()">×</button>
-                        </div>
-                        <div class="modal-body">
-                            ${queueItems}
-                        </div>
-                    </div>
-                `;
-                
-                document.body.appendChild(overlay);
-            } catch (e) {
-                showToast('Failed to load queue', 'error');
-            }
-        }
-        
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-        
-        // ============================================
-        // Init
-        // ============================================
-        loadStatus();
-        loadConfig();
-        loadControlStatus();
-        checkForUpdates();
-        connectLogs(currentLog);
-        setInterval(loadStatus, 10000);
-        setInterval(loadControlStatus, 5000);
-    </script>
+    <script src="{{JS_URL}}" defer></script>
 </body>
 </html>
 """
 
 
+# Stylesheet and script are served separately under content-hashed URLs,
+# so browsers cache them for good and the page itself stays small
+_DASHBOARD_CSS = StaticAsset(
+    DASHBOARD_CSS, "text/css; charset=utf-8", IMMUTABLE_CACHE, minify_css
+)
+_DASHBOARD_JS = StaticAsset(
+    DASHBOARD_JS, "text/javascript; charset=utf-8", IMMUTABLE_CACHE, minify_js
+)
+_DASHBOARD_CSS_URL = f"/static/dashboard.{_DASHBOARD_CSS.digest}.css"
+_DASHBOARD_JS_URL = f"/static/dashboard.{_DASHBOARD_JS.digest}.js"
+_DASHBOARD = StaticAsset(
+    DASHBOARD_HTML
+    .replace("{{CSS_URL}}", _DASHBOARD_CSS_URL)
+    .replace("{{JS_URL}}", _DASHBOARD_JS_URL)
+)
+
+
+@app.get(_DASHBOARD_CSS_URL, include_in_schema=False)
+async def dashboard_css(request: Request):
+    """Dashboard stylesheet."""
+    return _DASHBOARD_CSS.response(request)
+
+
+@app.get(_DASHBOARD_JS_URL, include_in_schema=False)
+async def dashboard_js(request: Request):
+    """Dashboard script."""
+    return _DASHBOARD_JS.response(request)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     """Serve dashboard UI."""
@@ -1508,9 +1842,9 @@ async def dashboard(request: Request):
     token = request.cookies.get(settings.cookie_name)
     
     if not token or not verify_token(token):
-        return RedirectResponse(url="/login", status_code=303)
+        return Response(status_code=303, headers=_LOGIN_REDIRECT_HEADERS)
     
-    return DASHBOARD_HTML
+    return _DASHBOARD.response(request)
 
 
 if __name__ == "__main__":
@@ -1519,5 +1853,8 @@ if __name__ == "__main__":
         "management.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        # C event loop and HTTP parser (both ship with uvicorn[standard])
+        loop="uvloop",
+        http="httptools",
+        reload=settings.mgmt_reload,
     )
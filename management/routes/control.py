@@ -7,12 +7,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from management.auth import require_auth
+from management.bridge_client import get_bridge_client
 from management.routes.config import read_env
 
 router = APIRouter(prefix="/api/control", tags=["control"])
 
-BRIDGE_URL = "http://localhost:8080"
-
 
 def get_bridge_secret() -> str:
     """Get webhook secret from .env to authenticate with bridge."""
@@ -55,20 +54,20 @@ async def get_control_status() -> ControlStatusResponse:
     secret = get_bridge_secret()
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                f"{BRIDGE_URL}/control/status",
-                headers={"X-Bridge-Secret": secret},
+        client = get_bridge_client()
+        resp = await client.get(
+            "/control/status",
+            headers={"X-Bridge-Secret": secret},
+        )
+        
+        if resp.status_code == 200:
+            data = resp.json()
+            return ControlStatusResponse(**data)
+        else:
+            raise HTTPException(
+                status_code=resp.status_code,
+                detail=f"Bridge returned {resp.status_code}",
             )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                return ControlStatusResponse(**data)
-            else:
-                raise HTTPException(
-                    status_code=resp.status_code,
-                    detail=f"Bridge returned {resp.status_code}",
-                )
     except httpx.ConnectError:
         raise HTTPException(503, "Cannot connect to bridge")
     except httpx.TimeoutException:
@@ -86,21 +85,21 @@ async def pause_bridge(request: PauseRequest) -> PauseResponse:
     secret = get_bridge_secret()
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                f"{BRIDGE_URL}/control/pause",
-                headers={"X-Bridge-Secret": secret},
-                json=request.model_dump(),
+        client = get_bridge_client()
+        resp = await client.post(
+            "/control/pause",
+            headers={"X-Bridge-Secret": secret},
+            json=request.model_dump(),
+        )
+        
+        if resp.status_code == 200:
+            data = resp.json()
+            return PauseResponse(**data)
+        else:
+            raise HTTPException(
+                status_code=resp.status_code,
+                detail=f"Bridge returned {resp.status_code}",
             )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                return PauseResponse(**data)
-            else:
-                raise HTTPException(
-                    status_code=resp.status_code,
-                    detail=f"Bridge returned {resp.status_code}",
-                )
     except httpx.ConnectError:
         raise HTTPException(503, "Cannot connect to bridge")
     except httpx.TimeoutException:
@@ -118,21 +117,22 @@ async def resume_bridge(send_queued: bool = True) -> PauseResponse:
     secret = get_bridge_secret()
     
     try:
-        async with httpx.AsyncClient(timeout=30) as client:  # Longer timeout for sending queued
-            resp = await client.post(
-                f"{BRIDGE_URL}/control/resume",
-                headers={"X-Bridge-Secret": secret},
-                params={"send_queued": str(send_queued).lower()},
+        client = get_bridge_client()
+        resp = await client.post(
+            "/control/resume",
+            timeout=30,  # Longer timeout for sending queued
+            headers={"X-Bridge-Secret": secret},
+            params={"send_queued": str(send_queued).lower()},
+        )
+        
+        if resp.status_code == 200:
+            data = resp.json()
+            return PauseResponse(**data)
+        else:
+            raise HTTPException(
+                status_code=resp.status_code,
+                detail=f"Bridge returned {resp.status_code}",
             )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                return PauseResponse(**data)
-            else:
-                raise HTTPException(
-                    status_code=resp.status_code,
-                    detail=f"Bridge returned {resp.status_code}",
-                )
     except httpx.ConnectError:
         raise HTTPException(503, "Cannot connect to bridge")
     except httpx.TimeoutException:
@@ -145,20 +145,20 @@ async def clear_queue() -> ClearQueueResponse:
     secret = get_bridge_secret()
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                f"{BRIDGE_URL}/control/clear-queue",
-                headers={"X-Bridge-Secret": secret},
+        client = get_bridge_client()
+        resp = await client.post(
+            "/control/clear-queue",
+            headers={"X-Bridge-Secret": secret},
+        )
+        
+        if resp.status_code == 200:
+            data = resp.json()
+            return ClearQueueResponse(**data)
+        else:
+            raise HTTPException(
+                status_code=resp.status_code,
+                detail=f"Bridge returned {resp.status_code}",
             )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                return ClearQueueResponse(**data)
-            else:
-                raise HTTPException(
-                    status_code=resp.status_code,
-                    detail=f"Bridge returned {resp.status_code}",
-                )
     except httpx.ConnectError:
         raise HTTPException(503, "Cannot connect to bridge")
     except httpx.TimeoutException:
@@ -1,14 +1,15 @@
 """Health and status routes."""
 
+import asyncio
 import platform
 import time
 from typing import Optional
 
-import httpx
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
-from management.auth import require_auth
+from management.auth import require_auth, verify_token
+from management.bridge_client import get_bridge_client
 from management.config import settings
 from management.routes.services import get_all_services, get_service_status
 
@@ -16,6 +17,15 @@ router = APIRouter(tags=["health"])
 
 _start_time = time.time()
 
+# How often /api/status/ws re-checks health (it only sends on change)
+STATUS_PUSH_INTERVAL = 10.0
+
+# Constant for the life of the process, so computed once
+_SYSTEM_INFO = {
+    "hostname": platform.node(),
+    "platform": platform.platform(),
+}
+
 
 class HealthResponse(BaseModel):
     status: str  # "healthy", "degraded", "unhealthy"
@@ -42,10 +52,9 @@ async def health() -> HealthResponse:
     # Try to get bridge health
     bridge_health = None
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            resp = await client.get("http://localhost:8080/health")
-            if resp.status_code == 200:
-                bridge_health = resp.json()
+        resp = await get_bridge_client().get("/health", timeout=5)
+        if resp.status_code == 200:
+            bridge_health = resp.json()
     except:
         pass
     
@@ -64,10 +73,7 @@ async def health() -> HealthResponse:
         uptime_seconds=time.time() - _start_time,
         services=services,
         bridge_health=bridge_health,
-        system={
-            "hostname": platform.node(),
-            "platform": platform.platform(),
-        },
+        system=_SYSTEM_INFO,
     )
 
 
@@ -87,3 +93,53 @@ async def detailed_status() -> dict:
             "install_dir": str(settings.install_dir),
         },
     }
+
+
+def _dashboard_view(health: HealthResponse) -> tuple:
+    """The parts of a health snapshot the dashboard displays."""
+    bridge = health.bridge_health or {}
+    return (
+        health.status,
+        health.services,
+        (bridge.get("nightline") or {}).get("connected"),
+        (bridge.get("watcher") or {}).get("chat_db_accessible"),
+        (bridge.get("queue") or {}).get("size"),
+    )
+
+
+@router.websocket("/api/status/ws")
+async def status_stream(websocket: WebSocket):
+    """
+    Push health snapshots to the dashboard.
+    
+    Re-checks every STATUS_PUSH_INTERVAL seconds but only sends when
+    something the dashboard shows has changed (uptime ticking doesn't
+    count). Any message from the client forces an immediate re-check.
+    Auth via the session cookie, like the log stream.
+    """
+    session_token = websocket.cookies.get(settings.cookie_name)
+    if not session_token or not verify_token(session_token):
+        await websocket.close(code=4001, reason="Unauthorized")
+        return
+    
+    await websocket.accept()
+    
+    last_view = None
+    try:
+        while True:
+            snapshot = await health()
+            view = _dashboard_view(snapshot)
+            if view != last_view:
+                await websocket.send_text(snapshot.model_dump_json())
+                last_view = view
+            
+            # Waiting on receive() rather than sleeping notices a closed
+            # socket right away instead of polling for it forever
+            try:
+                message = await asyncio.wait_for(websocket.receive(), STATUS_PUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                continue
+            if message["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
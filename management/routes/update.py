@@ -93,8 +93,9 @@ def do_update(install_dir: Path):
     venv_pip = install_dir / ".venv" / "bin" / "pip"
     if venv_pip.exists():
         subprocess.run(
-            [str(venv_pip), "install", "-q", "fastapi", "uvicorn[standard]", 
-             "pydantic", "pydantic-settings", "httpx", "watchdog", "python-multipart"],
+            [str(venv_pip), "install", "-q", "fastapi", "uvicorn[standard]",
+             "pydantic", "pydantic-settings", "httpx[http2]", "orjson", "watchdog",
+             "python-multipart"],
             cwd=install_dir,
             capture_output=True,
         )
@@ -58,7 +58,7 @@ if command -v poetry &> /dev/null; then
 else
     echo "Poetry not found, using pip..."
     python3 -m pip install -r requirements.txt 2>/dev/null || \
-    python3 -m pip install fastapi uvicorn pydantic pydantic-settings httpx watchdog
+    python3 -m pip install fastapi "uvicorn[standard]" pydantic pydantic-settings "httpx[http2]" orjson watchdog
     PYTHON_PATH=$(which python3)
 fi
 
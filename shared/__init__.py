@@ -0,0 +1 @@
+"""Code shared by the bridge (app/) and the Management Agent (management/)."""
@@ -0,0 +1,185 @@
+"""Fixed HTML pages served precompressed, with ETag revalidation."""
+
+import gzip
+import hashlib
+import re
+from functools import lru_cache
+from typing import Callable
+
+from fastapi import Request, Response, status
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_SCRIPT_RE = re.compile(r"(<script\b[^>]*>)(.*?)(</script>)", re.S)
+_STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style>)", re.S)
+# Elements whose whitespace is content; kept byte for byte
+_VERBATIM_RE = re.compile(r"<(pre|textarea)\b[^>]*>.*?</\1>", re.S)
+
+# For assets whose URL changes with their content (see StaticAsset.digest)
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def _strip_lines(text: str, drop: Callable[[str], bool] = lambda line: False) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not drop(line))
+
+
+# Cheap, conservative minifiers for our inline pages: drop indentation,
+# blank lines and comments, but keep newlines, so whitespace between
+# inline elements renders the same and JS never depends on semicolon
+# insertion across a joined line.
+
+def minify_css(css: str) -> str:
+    """Strip comments, indentation and blank lines from a stylesheet."""
+    return _strip_lines(_CSS_COMMENT_RE.sub("", css))
+
+
+def minify_js(code: str) -> str:
+    """Strip indentation, blank lines and whole-line // comments from a script."""
+    return _strip_lines(code, lambda line: line.startswith("//"))
+
+
+def minify_html(body: str) -> str:
+    """Minify a page with its <style> and <script> blocks; <pre>/<textarea> stay as is."""
+    # Blocks the markup pass must not touch are swapped for placeholders;
+    # scripts first, since "<!--" or "<pre>" can appear inside JS strings
+    blocks: list[str] = []
+    def stash(block: str) -> str:
+        blocks.append(block)
+        return f"\0{len(blocks) - 1}\0"
+
+    def minify_block(minify: Callable[[str], str]) -> Callable[[re.Match], str]:
+        def sub(match: re.Match) -> str:
+            open_tag, code, close_tag = match.groups()
+            return stash(f"{open_tag}\n{minify(code)}\n{close_tag}" if code.strip() else match[0])
+        return sub
+
+    body = _SCRIPT_RE.sub(minify_block(minify_js), body)
+    body = _VERBATIM_RE.sub(lambda match: stash(match[0]), body)
+    body = _STYLE_RE.sub(minify_block(minify_css), body)
+    body = _strip_lines(_HTML_COMMENT_RE.sub("", body))
+    return re.sub(r"\0(\d+)\0", lambda m: blocks[int(m.group(1))], body)
+
+
+@lru_cache(maxsize=32)
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip, honouring q-values.
+
+    "gzip;q=0" is an explicit refusal, and "*" covers gzip unless it is
+    listed separately. Browsers send a handful of fixed strings, so the
+    parse is cached.
+    """
+    wildcard = False
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q > 0
+        else:
+            return q > 0
+    return wildcard
+
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that reads Accept-Encoding with accepts_gzip.
+
+    Starlette's own check is a substring test, so it would still gzip for a
+    client sending "gzip;q=0" (and recompress StaticAsset's raw variant).
+    Only the public GZipMiddleware API is used: a refusal skips it, and
+    everything else goes through it unchanged.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+            if "gzip" in accept_encoding and not accepts_gzip(accept_encoding):
+                # Starlette would gzip on the substring match; send as is
+                await self.app(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check: a list of tags, compared weakly as RFC 9110 asks."""
+    if not if_none_match:
+        return False
+    if if_none_match == etag:
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class StaticAsset:
+    """
+    A page whose body never changes while the process runs.
+
+    Encoded and gzipped once at import; each hit just picks a variant
+    and answers If-None-Match with a 304.
+
+    Usage:
+        PAGE = StaticAsset(PAGE_HTML)
+        SCRIPT = StaticAsset(JS, "text/javascript; charset=utf-8", IMMUTABLE_CACHE, minify_js)
+
+        @app.get("/page")
+        async def page(request: Request):
+            return PAGE.response(request)
+    """
+
+    def __init__(
+        self,
+        body: str,
+        media_type: str = "text/html; charset=utf-8",
+        cache_control: str = "private, max-age=60",
+        minify: Callable[[str], str] | None = minify_html,
+    ):
+        if minify:
+            body = minify(body)
+        self.raw = body.encode("utf-8")
+        self.gzipped = gzip.compress(self.raw, compresslevel=9)
+        self.media_type = media_type
+        # Content hash, also usable as a cache-busting URL component
+        self.digest = hashlib.blake2b(self.raw, digest_size=8).hexdigest()
+        self.etag = f'"{self.digest}"'
+        # Each encoding needs its own validator, or a cache could hand a
+        # gzipped body to a client that never asked for one
+        self.gzip_etag = self.etag[:-1] + '-gzip"'
+        self._headers = {
+            "cache-control": cache_control,
+            "etag": self.etag,
+            "vary": "Accept-Encoding",
+        }
+        self._gzip_headers = {
+            **self._headers,
+            "etag": self.gzip_etag,
+            "content-encoding": "gzip",
+        }
+
+    def response(self, request: Request) -> Response:
+        """Build the response for a request: gzip if accepted, 304 if unchanged."""
+        if accepts_gzip(request.headers.get("accept-encoding", "")):
+            content, headers = self.gzipped, self._gzip_headers
+        else:
+            content, headers = self.raw, self._headers
+
+        if _etag_matches(request.headers.get("if-none-match"), headers["etag"]):
+            # 304s carry no body, so no Content-Encoding either
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=self._headers | {"etag": headers["etag"]},
+            )
+
+        return Response(content=content, media_type=self.media_type, headers=headers)
@@ -0,0 +1 @@
+"""Tests for iPhone Bridge and the Management Agent."""
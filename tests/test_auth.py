@@ -0,0 +1,80 @@
+"""Tests for the management login rate limit."""
+
+import pytest
+from starlette.requests import Request
+
+from management import auth
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """A fake monotonic clock, and no failures left over between tests."""
+    now = [1000.0]
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(auth, "_login_failures", {})
+    return now
+
+
+def _request(peer: str, **headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "client": (peer, 50000),
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_blocks_after_limit_within_window():
+    for _ in range(auth.LOGIN_FAILURE_LIMIT - 1):
+        auth.record_login_failure("203.0.113.7")
+    assert auth.login_allowed("203.0.113.7")
+
+    auth.record_login_failure("203.0.113.7")
+    assert not auth.login_allowed("203.0.113.7")
+    assert auth.login_allowed("198.51.100.2")
+
+
+def test_failures_expire_after_window(clock):
+    for _ in range(auth.LOGIN_FAILURE_LIMIT):
+        auth.record_login_failure("203.0.113.7")
+    assert not auth.login_allowed("203.0.113.7")
+
+    clock[0] += auth.LOGIN_FAILURE_WINDOW + 1
+    assert auth.login_allowed("203.0.113.7")
+    # A fully expired client is dropped, not kept as an empty entry
+    assert "203.0.113.7" not in auth._login_failures
+
+
+def test_window_slides_per_failure(clock):
+    auth.record_login_failure("203.0.113.7")
+    clock[0] += auth.LOGIN_FAILURE_WINDOW / 2
+    for _ in range(auth.LOGIN_FAILURE_LIMIT - 1):
+        auth.record_login_failure("203.0.113.7")
+    assert not auth.login_allowed("203.0.113.7")
+
+    # Only the first failure has aged out
+    clock[0] += auth.LOGIN_FAILURE_WINDOW / 2 + 1
+    assert auth.login_allowed("203.0.113.7")
+    assert len(auth._login_failures["203.0.113.7"]) == auth.LOGIN_FAILURE_LIMIT - 1
+
+
+def test_evicts_longest_tracked_client(monkeypatch):
+    monkeypatch.setattr(auth, "LOGIN_FAILURE_CLIENTS", 3)
+    for client in ("a", "b", "c"):
+        auth.record_login_failure(client)
+    # Known clients don't count against the cap
+    auth.record_login_failure("a")
+    assert list(auth._login_failures) == ["a", "b", "c"]
+
+    auth.record_login_failure("d")
+    assert list(auth._login_failures) == ["b", "c", "d"]
+
+
+def test_login_client_uses_cloudflare_address_behind_tunnel():
+    assert auth.login_client(_request("127.0.0.1", cf_connecting_ip="203.0.113.7")) == "203.0.113.7"
+    assert auth.login_client(_request("::1", cf_connecting_ip="203.0.113.7")) == "203.0.113.7"
+    assert auth.login_client(_request("127.0.0.1")) == "127.0.0.1"
+
+
+def test_login_client_ignores_forwarded_header_from_other_peers():
+    request = _request("192.168.1.20", cf_connecting_ip="203.0.113.7")
+    assert auth.login_client(request) == "192.168.1.20"
@@ -0,0 +1,63 @@
+"""Tests for NightlineClient's inline POST retries."""
+
+import httpx
+import pytest
+
+from app.webhooks import client as client_module
+from app.webhooks.client import NightlineClient
+
+URL = "http://nightline.test/webhooks/message"
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(client_module.random, "uniform", lambda a, b: 0.0)
+
+
+def _client(responses: list) -> tuple[NightlineClient, list]:
+    """A client whose transport answers from `responses` (exceptions are raised)."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        result = responses[len(calls) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return httpx.Response(result)
+
+    nightline = NightlineClient(base_url="http://nightline.test", secret="s")
+    nightline._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return nightline, calls
+
+
+@pytest.mark.parametrize("error", [httpx.ReadError, httpx.RemoteProtocolError])
+async def test_retries_any_transport_error(error):
+    nightline, calls = _client([error("dropped"), 200])
+
+    response = await nightline._post_with_retry(URL, b"{}", base=0)
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    await nightline.close()
+
+
+async def test_final_transport_error_is_raised_and_counted():
+    nightline, calls = _client([httpx.RemoteProtocolError("dropped")] * 3)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        await nightline._post_with_retry(URL, b"{}", base=0)
+
+    assert len(calls) == 3
+    assert nightline._failures == 1
+    await nightline.close()
+
+
+async def test_no_retry_past_budget():
+    nightline, calls = _client([503, 200])
+
+    response = await nightline._post_with_retry(URL, b"{}", base=1.0, budget=0.5)
+
+    assert response.status_code == 503
+    assert len(calls) == 1
+    assert nightline._failures == 1
+    await nightline.close()
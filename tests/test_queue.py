@@ -0,0 +1,117 @@
+"""Tests for the retry queue and its storage backends."""
+
+import asyncio
+
+import pytest
+
+from app.services.queue import InMemoryBackend, MessageQueue, QueuedMessage, SqliteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    backend = InMemoryBackend() if request.param == "memory" else SqliteBackend(tmp_path / "q.db")
+    yield backend
+    backend.close()
+
+
+def _msg(message_id: str, next_retry_at: float, attempts: int = 0) -> QueuedMessage:
+    return QueuedMessage(
+        id=message_id,
+        payload=b'{"id": "%s"}' % message_id.encode(),
+        created_at=1.0,
+        attempts=attempts,
+        next_retry_at=next_retry_at,
+    )
+
+
+def test_pop_due_in_retry_order(backend):
+    for message_id, retry_at in (("c", 30.0), ("a", 10.0), ("b", 20.0)):
+        backend.push(_msg(message_id, retry_at))
+
+    assert backend.next_due_at() == 10.0
+    assert [m.id for m in backend.pop_due(25.0)] == ["a", "b"]
+    assert [m.id for m in backend.pop_due(100.0)] == ["c"]
+    assert len(backend) == 3
+
+
+def test_removed_message_is_skipped(backend):
+    backend.push(_msg("a", 10.0))
+    backend.push(_msg("b", 10.0))
+    backend.remove("a")
+
+    assert "a" not in backend
+    assert [m.id for m in backend.pop_due(20.0)] == ["b"]
+    assert len(backend) == 1
+
+
+def test_rescheduled_message_pops_once_at_new_time(backend):
+    backend.push(_msg("a", 10.0))
+    backend.push(_msg("a", 50.0, attempts=1))
+
+    assert backend.pop_due(20.0) == []
+    due = backend.pop_due(60.0)
+    assert [(m.id, m.attempts) for m in due] == [("a", 1)]
+
+
+def test_stats(backend):
+    assert backend.stats() == (0, None, {})
+    backend.push(_msg("a", 10.0, attempts=1))
+    backend.push(QueuedMessage(id="b", payload=b"{}", created_at=0.5, next_retry_at=10.0))
+    backend.push(_msg("c", 10.0, attempts=1))
+
+    assert backend.stats() == (3, 0.5, {0: 1, 1: 2})
+
+
+def test_sqlite_persists_across_reopen(tmp_path):
+    path = tmp_path / "q.db"
+    backend = SqliteBackend(path)
+    backend.push(_msg("a", 20.0))
+    backend.push(_msg("b", 10.0))
+    backend.push(_msg("b", 30.0, attempts=2))
+    backend.push(_msg("c", 5.0))
+    backend.remove("c")
+    backend.close()
+
+    reopened = SqliteBackend(path)
+    try:
+        assert len(reopened) == 2
+        assert "c" not in reopened
+        due = reopened.pop_due(100.0)
+        assert [(m.id, m.attempts, m.next_retry_at) for m in due] == [
+            ("a", 0, 20.0),
+            ("b", 2, 30.0),
+        ]
+        assert due[0].payload == b'{"id": "a"}'
+    finally:
+        reopened.close()
+
+
+async def test_stop_waits_for_inflight_deliveries(tmp_path):
+    path = tmp_path / "q.db"
+    started = asyncio.Event()
+    finished = []
+
+    async def deliver(payload: bytes) -> bool:
+        started.set()
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            finished.append(payload)
+        return True
+
+    backend = SqliteBackend(path)
+    backend.push(_msg("a", 0.0))
+    queue = MessageQueue(deliver_fn=deliver, backend=backend)
+    await queue.start()
+    await asyncio.wait_for(started.wait(), 1)
+
+    await queue.stop()
+    assert finished == [b'{"id": "a"}']
+    assert not queue.is_running
+
+    # The interrupted delivery is still queued, untouched, for the next run
+    reopened = SqliteBackend(path)
+    try:
+        assert [(m.id, m.attempts) for m in reopened.pop_due(1.0)] == [("a", 0)]
+    finally:
+        reopened.close()
@@ -0,0 +1,169 @@
+"""Tests for the precompressed page helpers and gzip negotiation."""
+
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from shared.static import (
+    StaticAsset,
+    _etag_matches,
+    accepts_gzip,
+    minify_css,
+    minify_html,
+    minify_js,
+)
+
+
+def _request(**headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_minify_css():
+    css = """
+        /* header */
+        .a {
+            color: red; /* inline */
+        }
+
+    """
+    assert minify_css(css) == ".a {\ncolor: red;\n}"
+
+
+def test_minify_js_keeps_code_and_drops_line_comments():
+    code = """
+        // setup
+        const url = "http://example.com"; // trailing stays
+        let re = /a\\/\\/b/;
+
+    """
+    assert minify_js(code) == (
+        'const url = "http://example.com"; // trailing stays\nlet re = /a\\/\\/b/;'
+    )
+
+
+def test_minify_html_scopes_css_to_style_blocks():
+    page = """
+        <!-- dropped -->
+        <style>
+            /* dropped */
+            p { margin: 0; }
+        </style>
+        <p>Matches /* anything */ here</p>
+    """
+    assert minify_html(page) == (
+        "<style>\np { margin: 0; }\n</style>\n<p>Matches /* anything */ here</p>"
+    )
+
+
+def test_minify_html_keeps_pre_and_textarea_verbatim():
+    pre = "<pre>\n    indented\n\n    /* kept */ <!-- kept -->\n</pre>"
+    textarea = '<textarea name="t">\n  line one\n\n  line two</textarea>'
+    page = f"""
+        <div>
+            {pre}
+            {textarea}
+        </div>
+    """
+    assert minify_html(page) == f"<div>\n{pre}\n{textarea}\n</div>"
+
+
+def test_minify_html_minifies_scripts_without_touching_strings():
+    page = """
+        <script>
+            // dropped
+            const s = "/* <!-- <pre> */";
+        </script>
+        <script src="/app.js"></script>
+    """
+    assert minify_html(page) == (
+        '<script>\nconst s = "/* <!-- <pre> */";\n</script>\n<script src="/app.js"></script>'
+    )
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("GZIP", True),
+        ("x-gzip", True),
+        ("gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0", False),
+        ("gzip;q=bogus", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("*, gzip;q=0", False),
+        ("gzip;q=0, *", False),
+        ("*;q=0, gzip", True),
+        ("identity", False),
+        ("deflate, br", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(accept_encoding, expected):
+    assert accepts_gzip(accept_encoding) is expected
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz",W/"abc"', True),
+        ('"xyz"', False),
+        ('"abc-gzip"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert _etag_matches(if_none_match, '"abc"') is expected
+
+
+@pytest.fixture
+def asset():
+    return StaticAsset("<p>hello</p>" * 100, minify=None)
+
+
+def test_response_picks_gzip_variant(asset):
+    response = asset.response(_request(accept_encoding="gzip"))
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == asset.gzip_etag
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == asset.raw
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip;q=0", ""])
+def test_response_picks_raw_variant(asset, accept_encoding):
+    response = asset.response(_request(accept_encoding=accept_encoding))
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == asset.etag
+    assert response.body == asset.raw
+
+
+def test_response_304_for_matching_variant(asset):
+    response = asset.response(_request(accept_encoding="gzip", if_none_match=asset.gzip_etag))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == asset.gzip_etag
+    assert response.headers["cache-control"] == "private, max-age=60"
+
+
+def test_response_full_body_for_other_variants_etag(asset):
+    # A cached raw copy doesn't validate the gzip variant, and vice versa
+    response = asset.response(_request(accept_encoding="gzip", if_none_match=asset.etag))
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+    response = asset.response(_request(if_none_match=asset.gzip_etag))
+    assert response.status_code == 200
+    assert response.body == asset.raw